@@ -2,13 +2,82 @@
 
 import random
 from utility import *
+import solvers
+import decision_tree as tree
+import tfidf as tfidf_solver
 
 # referred to as the brute force algorithm in week 2 slides
 # idea here is to only limit solution space to words that match the feedback pattern of your most recent guess WHEN COMPARED WITH THE SOLUTION
-def only_matched_patterns(current_guesses, guess_feedback, valid_solutions):
-    remaining_solutions = []
-    for word in valid_solutions:
-        current_word_feedback = generate_feedback(current_guesses[-1], word)
-        if current_word_feedback == guess_feedback[-1]:
-            remaining_solutions.append(word)
-    return random.choice(remaining_solutions)
+# matching_solutions reads the row of the feedback matrix for the most recent guess instead of calling generate_feedback for every word
+# in hard mode only the matches the rules still allow are kept, the solution is always one of them
+def only_matched_patterns(current_guesses, guess_feedback, valid_solutions, game_state=None):
+    return random.choice(only_matched_patterns_choices(current_guesses, guess_feedback, valid_solutions, game_state))
+
+
+# the *_choices functions return every guess the algorithm could pick this turn, the algorithm picks one of them at random
+# the backend caches these for every game history, see guess_cache.py
+# algorithms that take a game_state only pick guesses the rules allow when the game is in hard mode (game_state.hard_mode)
+def only_matched_patterns_choices(current_guesses, guess_feedback, valid_solutions, game_state=None):
+    matches = matching_solutions(current_guesses[-1], guess_feedback[-1], valid_solutions)
+    if game_state is not None and game_state.hard_mode:
+        matches = [word for word in matches if game_state.allows(word)]
+    return matches
+
+
+# uses letter frequency and feedback weighing as discussed in the week 2 slides, the same scores as letter_frequency in wordle_master.ipynb
+# every filtered guess is scored at once from precomputed letter counts, see solvers.letter_frequency_scores
+def letter_frequency(current_guesses, guess_feedback, valid_solutions, game_state=None):
+    return solvers.letter_frequency(current_guesses, guess_feedback, None, valid_solutions, game_state)
+
+
+def letter_frequency_choices(current_guesses, guess_feedback, valid_solutions, game_state=None):
+    return solvers.letter_frequency_choices(current_guesses, guess_feedback, game_state)
+
+
+# scores every valid guess by the Shannon entropy of its feedback over the solutions that match all feedback so far
+# and picks the highest scoring one, see solvers.entropy_scores for how the pattern histograms are counted
+# game_state is the GameState of the game from ui/sessions.py, its candidates are used instead of replaying the history
+def entropy(current_guesses, guess_feedback, valid_solutions, game_state=None):
+    return solvers.entropy(current_guesses, guess_feedback, None, valid_solutions, game_state)
+
+
+def entropy_choices(current_guesses, guess_feedback, valid_solutions, game_state=None):
+    return solvers.entropy_choices(current_guesses, guess_feedback, game_state)
+
+
+# answers every turn from the precomputed decision tree with a single lookup on the history, see wordle/decision_tree.py
+# build the tree first with python decision_tree.py in the wordle folder, otherwise this falls back to entropy
+def decision_tree(current_guesses, guess_feedback, valid_solutions, game_state=None):
+    return tree.decision_tree_guess(current_guesses, guess_feedback, None, valid_solutions, game_state)
+
+
+def decision_tree_choices(current_guesses, guess_feedback, valid_solutions, game_state=None):
+    return tree.decision_tree_choices(current_guesses, guess_feedback, game_state)
+
+
+# scores every guess by the tf-idf weights of its positional letters, letters and letter n-grams over the remaining solutions
+# see wordle/tfidf.py, the term-document matrix is built once when the module is imported
+def tfidf(current_guesses, guess_feedback, valid_solutions, game_state=None):
+    return tfidf_solver.tfidf(current_guesses, guess_feedback, None, valid_solutions, game_state)
+
+
+def tfidf_choices(current_guesses, guess_feedback, valid_solutions, game_state=None):
+    return tfidf_solver.tfidf_choices(current_guesses, guess_feedback, game_state)
+
+
+# picks the guess that leaves the fewest solutions in the worst case, see solvers.worst_case_sizes
+def minimax(current_guesses, guess_feedback, valid_solutions, game_state=None):
+    return solvers.minimax(current_guesses, guess_feedback, None, valid_solutions, game_state)
+
+
+def minimax_choices(current_guesses, guess_feedback, valid_solutions, game_state=None):
+    return solvers.minimax_choices(current_guesses, guess_feedback, game_state)
+
+
+# minimax that also looks one guess further ahead once few solutions are left, see solvers.minimax_lookahead_scores
+def minimax_lookahead(current_guesses, guess_feedback, valid_solutions, game_state=None):
+    return solvers.minimax_lookahead(current_guesses, guess_feedback, None, valid_solutions, game_state)
+
+
+def minimax_lookahead_choices(current_guesses, guess_feedback, valid_solutions, game_state=None):
+    return solvers.minimax_choices(current_guesses, guess_feedback, game_state, lookahead=True)
\ No newline at end of file
@@ -4,32 +4,57 @@ import flask
 import sqlite3
 import pathlib
 import random
+import uuid
+import datetime
 from utility import *
 from algorithms import *
-
-# https://gist.github.com/cfreshman/d97dbe7004522f7bc52ed2a6e22e2c04
-GUESSES_PATH = pathlib.Path(__file__).parent.parent / "wordle" / "valid_guesses.txt"
-
-# https://www.kaggle.com/datasets/bcruise/wordle-valid-words
-SOLUTIONS_PATH = pathlib.Path(__file__).parent.parent / "wordle" / "valid_solutions.txt"
+from sessions import LRUSessionStore
+from guess_cache import GuessCache, history_key
+from stats_writer import StatsWriter
+from metrics import Metrics, sample_stacks
+from opening_book import BOOK_PATH
+from decision_tree import TREE_PATH
+from game_state import GameState
+
+# the word lists are loaded once per process by wordle/words.py
+# GUESS_SET is for constant time membership checks
+from words import VALID_SOLUTIONS, GUESS_SET, GUESSES_PATH, SOLUTIONS_PATH
 
 # keeping track of these variables globally
 WORD_LENGTH = 5
 NUM_GUESSES = 6
-VALID_GUESSES = []
-VALID_SOLUTIONS = []
-with open(GUESSES_PATH, "r") as read_obj:
-    VALID_GUESSES = read_obj.read().split()
-    for i in range(len(VALID_GUESSES)):
-        VALID_GUESSES[i] = VALID_GUESSES[i].upper()
-with open(SOLUTIONS_PATH, "r") as read_obj:
-    VALID_SOLUTIONS = read_obj.read().split()
-    for i in range(len(VALID_SOLUTIONS)):
-        VALID_SOLUTIONS[i] = VALID_SOLUTIONS[i].upper()
 
 # creates an app with this file's name as the name of the app
 app = flask.Flask(__name__)
 
+# the GameState of every game in progress, keyed on the game id handed out by /get_solution_index/
+# set app.config["GAME_SESSIONS"] before the first request to use another store, see sessions.py
+app.config.setdefault("GAME_SESSIONS", LRUSessionStore(max_games=1000, ttl=60 * 60))
+
+
+# the word lists, opening book and decision tree decide every guess, so the cached guesses are only valid for the files they came from
+def guess_cache_version():
+    sources = [GUESSES_PATH, SOLUTIONS_PATH, BOOK_PATH, TREE_PATH]
+    return ",".join(str(source.stat().st_mtime_ns) if source.exists() else "-" for source in sources)
+
+
+# the guesses worked out by /generate_guess/ and /simulate/ for every mode and game history
+# the sqlite file is shared by every worker process of the app, delete it to empty the cache
+app.config.setdefault("GUESS_CACHE", GuessCache(pathlib.Path(__file__).parent / "guess_cache.sqlite3", version=guess_cache_version()))
+
+# finished games are written to the stats table in batches by a background thread, see stats_writer.py
+app.config.setdefault("STATS_WRITER", StatsWriter(pathlib.Path(__file__).parent / "db.sqlite3"))
+
+# request counts and latencies served by /metrics, see metrics.py
+app.config.setdefault("METRICS", Metrics())
+app.config["METRICS"].init_app(app)
+
+# set to True to allow one-off captures with the sampling profiler at /profile/
+app.config.setdefault("ENABLE_PROFILER", False)
+
+# the most games a single /simulate/ request plays, bigger requests are cut down to this many so one request can't tie up the server
+app.config.setdefault("MAX_SIMULATE_GAMES", 10000)
+
 
 # this is the route to access the user interface
 # This route will also access the db initally to obtain any stats already in the db
@@ -38,23 +63,10 @@ def index():
     # connection to the database
     connection = get_db()
 
-    # execute a sql command and return a cursor, used to iterate through data
-    cursor = connection.execute(
-        "SELECT mode, AVG(win) as win_rate, AVG(num_guesses) as avg_guesses "
-        "FROM stats "
-        "GROUP BY mode "
-        "ORDER BY win_rate DESC, avg_guesses, mode"
-    )
-
     # get stats from the db
     stats = {
-        "modes": cursor.fetchall()
+        "modes": get_stats(connection)
     }
-
-    # rounding the numbers
-    for i in range(len(stats["modes"])):
-        stats["modes"][i]["win_rate"] = round(stats["modes"][i]["win_rate"], 2)
-        stats["modes"][i]["avg_guesses"] = round(stats["modes"][i]["avg_guesses"], 2)
     
     return flask.render_template("index.html", **stats), 200
 
@@ -72,41 +84,35 @@ def insert_stat():
 
     mode = flask.request.args.get("mode", default="user", type=str)
 
+    # 1 if the game was played in hard mode
+    hard_mode = flask.request.args.get("hard_mode", default=0, type=int)
+
     # connection to the database
     connection = get_db()
 
-    # preventing sql injection attacks with ?
-    connection.execute(
-        "INSERT INTO stats(mode, win, num_guesses) "
-        "VALUES (?, ?, ?) ",
-        (mode, win, guess_num)
-    )
+    # the game is written with the next batch, get_stats already counts it
+    # add only waits on the database when the writer's queue is full
+    with app.config["METRICS"].timer("db"):
+        app.config["STATS_WRITER"].add([(stats_mode(mode, hard_mode), win, guess_num)])
 
     # get the updated data
-    cursor = connection.execute(
-        "SELECT mode, AVG(win) as win_rate, AVG(num_guesses) as avg_guesses "
-        "FROM stats "
-        "GROUP BY mode "
-        "ORDER BY win_rate DESC, avg_guesses, mode"
-    )
-
     stats = {
-        "modes": cursor.fetchall()
+        "modes": get_stats(connection)
     }
 
-    # rounding the numbers
-    for i in range(len(stats["modes"])):
-        stats["modes"][i]["win_rate"] = round(stats["modes"][i]["win_rate"], 2)
-        stats["modes"][i]["avg_guesses"] = round(stats["modes"][i]["avg_guesses"], 2)
-
     return flask.jsonify(**stats), 200
 
 
 # returns a random index corresponding to the current solution
 # this is called every time the game is reset in the frontend
+# also starts a server side session for the game, game_id can be passed to /check_guess/ and /generate_guess/
+# i.e. /get_solution_index/?hard_mode=1 starts a game in hard mode, where /check_guess/ only accepts guesses that could still be the solution
 @app.route("/get_solution_index/", methods=["GET"])
 def get_solution_index():
-    return flask.jsonify({"index": random.randint(0, len(VALID_SOLUTIONS) - 1)}), 200
+    hard_mode = flask.request.args.get("hard_mode", default=0, type=int)
+    game_id = uuid.uuid4().hex
+    app.config["GAME_SESSIONS"].put(game_id, GameState(hard_mode=bool(hard_mode)))
+    return flask.jsonify({"index": random.randint(0, len(VALID_SOLUTIONS) - 1), "game_id": game_id}), 200
 
 
 # Checks that a guess is valid and compares it to the solution word for feedback
@@ -115,27 +121,86 @@ def get_solution_index():
 # this is identical to the one in wordle_solution.py or wordle_master.ipynb
 @app.route("/check_guess/", methods=["POST"])
 def check_guess():
-    # TODO
     # both the solution index and current guess are passed in as part of the query
-    # i.e. /check_guess/?index=1&guess=HUMAN
-    # We want to extract the index and guess from this query
-    # see lines 69-73 for examples on how to get the solution index and current guess from the query
+    # i.e. /check_guess/?index=1&guess=HUMAN, optionally with &game_id=... to narrow down the session of the game
+    solution_index = flask.request.args.get("index", default=-1, type=int)
+    current_guess = flask.request.args.get("guess", default="", type=str).upper()
+    game_id = flask.request.args.get("game_id", default="", type=str)
 
-    # next, validate the arguments
-    # the solution index you just extracted has to be a valid index in VALID_SOLUTIONS
-    # and your current guess has to follow the rules of Wordle. Luckily, we have previously implemented
-    # is_valid_guess, which is available in utility.py for you to use
+    game_state = app.config["GAME_SESSIONS"].get(game_id) if game_id else None
 
-    # replace the False with any comparisons you need. Return the same way
-    if (False):
+    # the solution index has to be a valid index in VALID_SOLUTIONS and the guess has to follow the rules of Wordle
+    # and the rules of hard mode if the game is played in hard mode
+    if (solution_index < 0 or solution_index >= len(VALID_SOLUTIONS) or not is_valid_guess(current_guess, GUESS_SET)
+            or (game_state is not None and not game_state.allows(current_guess))):
         return flask.jsonify({"feedback": "INVALID"}), 200
     
     # useful to print to check against frontend
     print(VALID_SOLUTIONS[solution_index])
 
-    # since the guess is a valid guess, we need to generate the feedback that corresponds to this guess
-    # again, the previously implemented generate_feedback in utility.py can help
-    return flask.jsonify({"feedback": "REPLACE ME"}), 200
+    # the pattern code is looked up in the precomputed feedback matrix, PATTERN_STRINGS has the same string as generate_feedback
+    feedback_code = get_feedback_code(current_guess, VALID_SOLUTIONS[solution_index])
+    feedback = PATTERN_STRINGS[feedback_code]
+
+    # finished games don't need their session anymore
+    if game_state is not None:
+        game_state.update(current_guess, feedback, feedback_code)
+        if feedback == "CCCCC" or len(game_state.current_guesses) >= NUM_GUESSES:
+            app.config["GAME_SESSIONS"].delete(game_id)
+
+    return flask.jsonify({"feedback": feedback}), 200
+
+
+# win rate, average number of guesses and number of guesses distribution of every mode, or only of mode if it is given
+# over all games, or over the games completed in the last hours hours
+# i.e. /analytics/ or /analytics/?hours=24 or /analytics/?mode=entropy&hours=1
+# full hours are summed from mode_stats_hourly, only the part of the oldest hour that is in the window is counted from stats
+# over all games the games the stats writer hasn't written yet are added like get_stats does, so both agree right after a game.
+# a window only counts written games, games show up in it once the stats writer writes them, usually within a second
+@app.route("/analytics/", methods=["GET"])
+def analytics():
+    mode = flask.request.args.get("mode", default=None, type=str)
+    hours = flask.request.args.get("hours", default=None, type=float)
+
+    connection = get_db()
+    with app.config["METRICS"].timer("db"):
+        if hours is None:
+            with app.config["STATS_WRITER"].unwritten_stats(connection) as unwritten:
+                totals = {row["mode"]: row for row in connection.execute("SELECT " + TOTAL_COLUMNS + ", mode FROM mode_stats")}
+            for unwritten_mode, unwritten_totals in unwritten.items():
+                mode_totals = totals.setdefault(unwritten_mode, dict.fromkeys(TOTAL_COLUMNS.split(", "), 0))
+                for column, value in zip(TOTAL_COLUMNS.split(", "), unwritten_totals):
+                    mode_totals[column] += value
+            modes = [mode] if mode is not None else list(totals)
+            results = [summarize_totals(mode, totals.get(mode)) for mode in modes]
+        else:
+            modes = [mode] if mode is not None else [row["mode"] for row in connection.execute("SELECT mode FROM mode_stats")]
+            start = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(hours=hours)
+            results = [summarize_totals(mode, window_totals(connection, mode, start)) for mode in modes]
+    return flask.jsonify({"hours": hours, "modes": results}), 200
+
+
+# games, win rate and average number of guesses of mode for every hour in the last hours hours (24 by default), oldest first
+# i.e. /analytics/timeseries/?mode=entropy&hours=168
+# like the windows of /analytics/ only the games the stats writer has written are counted
+@app.route("/analytics/timeseries/", methods=["GET"])
+def analytics_timeseries():
+    mode = flask.request.args.get("mode", default="user", type=str)
+    hours = flask.request.args.get("hours", default=24, type=int)
+
+    start = datetime.datetime.now(datetime.timezone.utc).replace(minute=0, second=0, microsecond=0) - datetime.timedelta(hours=hours - 1)
+    with app.config["METRICS"].timer("db"):
+        rows = get_db().execute(
+            "SELECT hour, games, wins, total_guesses "
+            "FROM mode_stats_hourly "
+            "WHERE mode = ? AND hour >= ? "
+            "ORDER BY hour",
+            (mode, start.strftime(TIME_FORMAT))
+        ).fetchall()
+    buckets = [{"hour": row["hour"], "games": row["games"],
+                "win_rate": round(row["wins"] / row["games"], 2), "avg_guesses": round(row["total_guesses"] / row["games"], 2)}
+               for row in rows if row["games"] > 0]
+    return flask.jsonify({"mode": mode, "hours": hours, "buckets": buckets}), 200
 
 
 # generates the guess using the specified algorithm and data
@@ -144,39 +209,282 @@ def generate_guess():
     # generates the guess using the specified algorithm and data
 
     # this dictionary should contain the keys current_guesses, guess_feedback, mode
+    # and optionally game_id, the id from /get_solution_index/, and hard_mode for games without a session
     # the data received here is sent from the frontend
     request_json = flask.request.get_json(force=True)
 
     current_guesses = request_json["current_guesses"]
     guess_feedback = request_json["guess_feedback"]
     mode = request_json["mode"]
+    game_id = request_json.get("game_id")
+    hard_mode = request_json.get("hard_mode")
+
+    # asking again on the same turn gives the guess that was already picked
+    game_state = get_game_state(game_id, current_guesses, guess_feedback, hard_mode)
+    guess = game_state.solver_cache.get(mode)
+    if guess is None:
+        guess = next_guess(mode, current_guesses, guess_feedback, game_state)
+    if guess is None:
+        return flask.jsonify({"guess": "INVALID"}), 400
+    app.config["METRICS"].set_mode(mode)
+    game_state.solver_cache[mode] = guess
+    return flask.jsonify({"guess": guess}), 200
+
+
+# number of games with a server side session and how much memory they use
+@app.route("/sessions/", methods=["GET"])
+def sessions():
+    return flask.jsonify(app.config["GAME_SESSIONS"].report()), 200
+
+
+# request counts and latency histograms in the Prometheus text format, for Prometheus to scrape or to read directly
+# every route is timed, /generate_guess/ and /simulate/ also per mode, and the time requests spend in the solvers and the db is split out
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    return flask.Response(app.config["METRICS"].render(), mimetype="text/plain; version=0.0.4"), 200
+
+
+# samples what every other thread of the server is doing for a few seconds, only when app.config["ENABLE_PROFILER"] is True
+# i.e. /profile/?seconds=10 while a simulation is running. The response is in the collapsed stack format,
+# which can be turned into a flame graph with flamegraph.pl or opened in https://www.speedscope.app
+@app.route("/profile/", methods=["POST"])
+def profile():
+    if not app.config["ENABLE_PROFILER"]:
+        return flask.jsonify({"error": "the profiler is disabled, set ENABLE_PROFILER"}), 404
+    seconds = min(flask.request.args.get("seconds", default=5, type=float), 60)
+    interval = flask.request.args.get("interval", default=0.005, type=float)
+    return flask.Response(sample_stacks(seconds, interval), mimetype="text/plain"), 200
+
+
+# size and hit rate of the guess cache in this process
+@app.route("/guess_cache/", methods=["GET"])
+def guess_cache():
+    return flask.jsonify(app.config["GUESS_CACHE"].report()), 200
+
+
+# returns the GameState of game_id brought up to date with the history sent by the frontend, so only the newest guesses are filtered
+# without a game_id, or if the game expired or its session doesn't match the history, a new GameState is made from the whole history
+# hard_mode=None keeps the hard mode setting of the session, a new GameState is only in hard mode if hard_mode is true
+def get_game_state(game_id, current_guesses, guess_feedback, hard_mode=None):
+    game_state = app.config["GAME_SESSIONS"].get(game_id) if game_id else None
+    num_known = 0 if game_state is None else len(game_state.current_guesses)
+    if (game_state is None or game_state.current_guesses != current_guesses[:num_known]
+            or game_state.guess_feedback != guess_feedback[:num_known]
+            or (hard_mode is not None and game_state.hard_mode != bool(hard_mode))):
+        game_state = GameState(current_guesses, guess_feedback, bool(hard_mode))
+    else:
+        for guess, feedback in zip(current_guesses[num_known:], guess_feedback[num_known:]):
+            game_state.update(guess, feedback)
+
+    if game_id:
+        app.config["GAME_SESSIONS"].put(game_id, game_state)
+    return game_state
+
+
+# Plays num_games games for a mode on the server instead of the browser sending two requests per guess.
+# All results are queued for the stats writer at the end, which inserts them in a few large transactions.
+# i.e. /simulate/?mode=entropy&num_games=1000&num_replays=3, add &hard_mode=1 to play by the rules of hard mode
+# num_games has to be positive and is capped at MAX_SIMULATE_GAMES, num_replays can't be negative and is capped at num_games
+# The response is streamed as one JSON object per line: {"completed", "num_games"} as games finish,
+# then a last line that also has the win rate and average guesses of this run, the updated stats for ALL modes
+# and num_replays randomly picked games (solution index, guesses and feedback) that the frontend can show on the board
+@app.route("/simulate/", methods=["POST"])
+def simulate():
+    mode = flask.request.args.get("mode", default="user", type=str)
+    num_games = flask.request.args.get("num_games", default=100, type=int)
+    num_replays = flask.request.args.get("num_replays", default=0, type=int)
+    hard_mode = flask.request.args.get("hard_mode", default=0, type=int)
+
+    # bad parameters are turned away before any game is played, once the response starts streaming it can't be a 400 anymore
+    if num_games <= 0 or num_replays < 0:
+        return flask.jsonify({"completed": 0, "num_games": 0, "error": "num_games has to be positive and num_replays can't be negative"}), 400
+    num_games = min(num_games, app.config["MAX_SIMULATE_GAMES"])
+    num_replays = min(num_replays, num_games)
+
+    # the user mode and unknown modes can't be simulated
+    if next_guess(mode, [], []) is None:
+        return flask.jsonify({"completed": 0, "num_games": 0, "error": f"{mode} can't be simulated"}), 400
+    app.config["METRICS"].set_mode(mode)
+
+    # send progress about 100 times per run
+    progress_every = max(1, num_games // 100)
+
+    def generate():
+        games = []
+        for i in range(num_games):
+            solution_index = random.randint(0, len(VALID_SOLUTIONS) - 1)
+            current_guesses, guess_feedback = play_server_game(mode, solution_index, bool(hard_mode))
+            games.append((solution_index, current_guesses, guess_feedback))
+            if (i + 1) % progress_every == 0 and i + 1 < num_games:
+                yield flask.json.dumps({"completed": i + 1, "num_games": num_games}) + "\n"
+
+        # same values the frontend sends to /insert_stat/
+        rows = [(stats_mode(mode, hard_mode), int(guess_feedback[-1] == "CCCCC"), len(current_guesses))
+                for _, current_guesses, guess_feedback in games]
+        with app.config["METRICS"].timer("db"):
+            app.config["STATS_WRITER"].add(rows)
+        connection = get_db()
+
+        replays = random.sample(games, num_replays)
+        yield flask.json.dumps({
+            "completed": num_games,
+            "num_games": num_games,
+            "win_rate": round(sum(win for _, win, _ in rows) / num_games, 2),
+            "avg_guesses": round(sum(num_guesses for _, _, num_guesses in rows) / num_games, 2),
+            "modes": get_stats(connection),
+            "replays": [{"index": solution_index, "current_guesses": current_guesses, "guess_feedback": guess_feedback}
+                        for solution_index, current_guesses, guess_feedback in replays],
+        }) + "\n"
+
+    return flask.Response(flask.stream_with_context(generate()), mimetype="application/x-ndjson"), 200
+
+
+# returns the next guess for mode, or None if mode isn't an algorithm the server knows about
+# game_state is the GameState of the game if there is one, algorithms that take it use its candidates
+# the choices of every history are cached, so only the first game to reach a history runs the algorithm
+# in hard mode (game_state.hard_mode) only guesses that could still be the solution are picked
+def next_guess(mode, current_guesses, guess_feedback, game_state=None):
+    cache = app.config["GUESS_CACHE"]
+    key = history_key(mode, current_guesses, guess_feedback, game_state is not None and game_state.hard_mode)
+    # the guess cache is backed by sqlite, so its lookups count as db time
+    with app.config["METRICS"].timer("db"):
+        choices = cache.get(key)
+    if choices is None:
+        with app.config["METRICS"].timer("solver") as timing:
+            choices = guess_choices(mode, current_guesses, guess_feedback, game_state)
+        if choices is None:
+            return None
+        app.config["METRICS"].observe_solver(mode, timing.seconds)
+        with app.config["METRICS"].timer("db"):
+            cache.put(key, choices)
+    return choices[0] if len(choices) == 1 else random.choice(choices)
+
+
+# returns every guess mode could pick after current_guesses (one of them is picked at random),
+# or None if mode isn't an algorithm the server knows about
+def guess_choices(mode, current_guesses, guess_feedback, game_state=None):
+    # the opening book in wordle/opening_book.json has the first guess of every mode
+    # and the second guess for modes like entropy, so these turns don't need any search
+    # in hard mode the book's second guess is skipped when the rules don't allow it
+    book_guess = get_book_guess(mode, current_guesses, guess_feedback)
+    if book_guess is not None and (game_state is None or game_state.allows(book_guess)):
+        return [book_guess]
 
     # an example of how to add your own algorithms
     if mode == "only_matched_patterns":
-        # example of how to add an initial guess
-        if len(current_guesses) == 0:
-            return flask.jsonify({"guess": "CRANE"}), 200
-        return flask.jsonify({"guess": only_matched_patterns(current_guesses, guess_feedback, VALID_SOLUTIONS)}), 200
-    
-    # TODO
-    # add your own algorithms here
-    # keep in mind that the only options for mode (i.e. the allowable algorithms) are:
-    # only_matched_patterns, letter_frequency, entropy and tfidf
-    # If you want to add custom algorithms with different naming schemes, talk to your project lead.
-    # It's not hard, just involves changing the frontend slightly.
-
-
-
-
-
-
+        return only_matched_patterns_choices(current_guesses, guess_feedback, VALID_SOLUTIONS, game_state)
 
+    if mode == "letter_frequency":
+        return letter_frequency_choices(current_guesses, guess_feedback, VALID_SOLUTIONS, game_state)
 
+    if mode == "entropy":
+        return entropy_choices(current_guesses, guess_feedback, VALID_SOLUTIONS, game_state)
 
+    if mode == "tfidf":
+        return tfidf_choices(current_guesses, guess_feedback, VALID_SOLUTIONS, game_state)
 
+    if mode == "decision_tree":
+        return decision_tree_choices(current_guesses, guess_feedback, VALID_SOLUTIONS, game_state)
 
+    if mode == "minimax":
+        return minimax_choices(current_guesses, guess_feedback, VALID_SOLUTIONS, game_state)
 
+    if mode == "minimax_lookahead":
+        return minimax_lookahead_choices(current_guesses, guess_feedback, VALID_SOLUTIONS, game_state)
+    
+    # TODO
+    # add your own algorithms here
+    # return a list with every guess your algorithm could pick, or [guess] if it always picks the same one
+    # keep in mind that the only options for mode (i.e. the allowable algorithms) are:
+    # only_matched_patterns, letter_frequency, entropy, tfidf, decision_tree, minimax and minimax_lookahead
+    # If you want to add custom algorithms with different naming schemes, talk to your project lead.
+    # It's not hard, just involves changing the frontend slightly.
+    return None
+
+
+# plays one game for mode against VALID_SOLUTIONS[solution_index] the same way the frontend does:
+# every guess gets feedback, including the final CCCCC. Returns current_guesses and guess_feedback
+def play_server_game(mode, solution_index, hard_mode=False):
+    game_state = GameState(hard_mode=hard_mode)
+    while len(game_state.current_guesses) < NUM_GUESSES:
+        current_guess = next_guess(mode, game_state.current_guesses, game_state.guess_feedback, game_state)
+        feedback_code = get_feedback_code(current_guess, VALID_SOLUTIONS[solution_index])
+        game_state.update(current_guess, PATTERN_STRINGS[feedback_code], feedback_code)
+        if game_state.guess_feedback[-1] == "CCCCC":
+            break
+    return game_state.current_guesses, game_state.guess_feedback
+
+
+# games played in hard mode are kept under their own mode in the stats, e.g. entropy_hard, so they don't change the stats of the mode
+def stats_mode(mode, hard_mode):
+    return mode + "_hard" if hard_mode else mode
+
+
+# win rate and average number of guesses for ALL modes, rounded for the frontend
+# read from the mode_stats rollup table (see sql/schema.sql), which has one row per mode however many games are in stats,
+# plus the games the stats writer hasn't written yet
+def get_stats(connection):
+    with app.config["METRICS"].timer("db"), app.config["STATS_WRITER"].unwritten_stats(connection) as unwritten:
+        totals = {row["mode"]: [row["games"], row["wins"], row["total_guesses"]]
+                  for row in connection.execute("SELECT mode, games, wins, total_guesses FROM mode_stats")}
+        for mode, (games, wins, total_guesses, *_) in unwritten.items():
+            mode_totals = totals.setdefault(mode, [0, 0, 0])
+            mode_totals[0] += games
+            mode_totals[1] += wins
+            mode_totals[2] += total_guesses
+
+    modes = [{"mode": mode, "win_rate": wins / games, "avg_guesses": total_guesses / games}
+             for mode, (games, wins, total_guesses) in totals.items() if games > 0]
+    modes.sort(key=lambda row: (-row["win_rate"], row["avg_guesses"], row["mode"]))
 
+    # rounding the numbers
+    for i in range(len(modes)):
+        modes[i]["win_rate"] = round(modes[i]["win_rate"], 2)
+        modes[i]["avg_guesses"] = round(modes[i]["avg_guesses"], 2)
+    return modes
+
+
+# the format of the completed column of stats and the hour column of mode_stats_hourly
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# the totals kept by mode_stats and mode_stats_hourly
+TOTAL_COLUMNS = ("games, wins, total_guesses, "
+                 "guesses_1, guesses_2, guesses_3, guesses_4, guesses_5, guesses_6")
+
+
+# totals of the games of mode completed since start (a UTC datetime), the same keys as the columns of mode_stats
+# the rollup has every hour that starts at or after start, the games before the first of those hours are counted with the (mode, completed) index
+def window_totals(connection, mode, start):
+    first_hour = start.replace(minute=0, second=0, microsecond=0)
+    if first_hour < start:
+        first_hour += datetime.timedelta(hours=1)
+
+    hourly = connection.execute(
+        "SELECT " + ", ".join(f"COALESCE(SUM({column}), 0) AS {column}" for column in TOTAL_COLUMNS.split(", ")) + " "
+        "FROM mode_stats_hourly "
+        "WHERE mode = ? AND hour >= ?",
+        (mode, first_hour.strftime(TIME_FORMAT))
+    ).fetchone()
+    edge = connection.execute(
+        "SELECT COUNT(*) AS games, COALESCE(SUM(win), 0) AS wins, COALESCE(SUM(num_guesses), 0) AS total_guesses, "
+        + ", ".join(f"COALESCE(SUM(num_guesses = {i}), 0) AS guesses_{i}" for i in range(1, NUM_GUESSES + 1)) + " "
+        "FROM stats "
+        "WHERE mode = ? AND completed >= ? AND completed < ?",
+        (mode, start.strftime(TIME_FORMAT), first_hour.strftime(TIME_FORMAT))
+    ).fetchone()
+    return {column: hourly[column] + edge[column] for column in hourly}
+
+
+# turns the totals of a mode into what the /analytics/ routes send back
+def summarize_totals(mode, totals):
+    games = totals["games"] if totals is not None else 0
+    return {
+        "mode": mode,
+        "games": games,
+        "win_rate": round(totals["wins"] / games, 2) if games > 0 else None,
+        "avg_guesses": round(totals["total_guesses"] / games, 2) if games > 0 else None,
+        "guess_distribution": {i: totals[f"guesses_{i}"] if games > 0 else 0 for i in range(1, NUM_GUESSES + 1)},
+    }
 
 
 # everything below is taken straight from EECS 485
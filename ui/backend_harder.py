@@ -7,25 +7,13 @@ import random
 from utility import *
 from algorithms import *
 
-# https://gist.github.com/cfreshman/d97dbe7004522f7bc52ed2a6e22e2c04
-GUESSES_PATH = pathlib.Path(__file__).parent.parent / "wordle" / "valid_guesses.txt"
-
-# https://www.kaggle.com/datasets/bcruise/wordle-valid-words
-SOLUTIONS_PATH = pathlib.Path(__file__).parent.parent / "wordle" / "valid_solutions.txt"
+# the word lists are loaded once per process by wordle/words.py
+# GUESS_SET and SOLUTION_SET are for constant time membership checks, GUESS_INDEX and SOLUTION_INDEX map a word to its index
+from words import VALID_GUESSES, VALID_SOLUTIONS, GUESS_SET, SOLUTION_SET, GUESS_INDEX, SOLUTION_INDEX
 
 # keeping track of these variables globally
 WORD_LENGTH = 5
 NUM_GUESSES = 6
-VALID_GUESSES = []
-VALID_SOLUTIONS = []
-with open(GUESSES_PATH, "r") as read_obj:
-    VALID_GUESSES = read_obj.read().split()
-    for i in range(len(VALID_GUESSES)):
-        VALID_GUESSES[i] = VALID_GUESSES[i].upper()
-with open(SOLUTIONS_PATH, "r") as read_obj:
-    VALID_SOLUTIONS = read_obj.read().split()
-    for i in range(len(VALID_SOLUTIONS)):
-        VALID_SOLUTIONS[i] = VALID_SOLUTIONS[i].upper()
 
 # creates an app with this file's name as the name of the app
 app = flask.Flask(__name__)
@@ -126,7 +114,8 @@ def check_guess():
     # next, validate the arguments
     # the solution index you just extracted has to be a valid index in VALID_SOLUTIONS
     # and your current guess has to follow the rules of Wordle. Luckily, we have previously implemented
-    # is_valid_guess, which is available in utility.py for you to use
+    # is_valid_guess, which is available in utility.py for you to use.
+    # Pass it GUESS_SET rather than VALID_GUESSES, checking a set is constant time while checking a list scans the whole list
 
     # replace the False with any comparisons you need. Return the same way
     # if a guess is invalid, send back the data with the key feedback having value "INVALID"
@@ -0,0 +1,103 @@
+# cache for /generate_guess/ keyed on the mode and the game history
+# many games share the same first turns, e.g. every entropy game opens with TARSE, so the answer for a history is worked out once
+# the cache stores every guess the mode could pick for the history (its "choices") instead of the guess it picked,
+# so randomized modes like only_matched_patterns still pick randomly from the right words on every cache hit
+# entries are kept in an in-process LRU, and optionally in an sqlite file that every worker process of the app shares
+
+import collections
+import json
+import sqlite3
+import threading
+import time
+
+
+# the cache key for mode after current_guesses, the same game history always gives the same key
+# i.e. entropy:TARSE=WMWWW,COLIN=WWCWW, or entropy:hard:TARSE=WMWWW,... in hard mode, where the same history can get other guesses
+def history_key(mode, current_guesses, guess_feedback, hard_mode=False):
+    history = ",".join(guess.upper() + "=" + feedback.upper() for guess, feedback in zip(current_guesses, guess_feedback))
+    return mode + (":hard:" if hard_mode else ":") + history
+
+
+class GuessCache:
+    # max_entries bounds both the in-process LRU and the sqlite file, path=None keeps the cache in this process only
+    # version is stored in the sqlite file, a file written with a different version (e.g. older word lists or opening book) is cleared
+    def __init__(self, path=None, max_entries=100000, version=""):
+        self.max_entries = max_entries
+        self.entries = collections.OrderedDict()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+        # flask serves requests on several threads, they share the connection and the LRU
+        self.lock = threading.Lock()
+        self.connection = None
+        if path is not None:
+            self.connection = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+            self.connection.execute("PRAGMA journal_mode = WAL")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS meta(key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS guess_cache("
+                "key TEXT PRIMARY KEY, choices TEXT NOT NULL, last_used REAL NOT NULL)"
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS guess_cache_last_used ON guess_cache(last_used)")
+            row = self.connection.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            if row is None or row[0] != version:
+                self.connection.execute("DELETE FROM guess_cache")
+                self.connection.execute("INSERT OR REPLACE INTO meta(key, value) VALUES ('version', ?)", (version,))
+
+    # returns the cached choices for key, or None if no process has worked them out yet
+    def get(self, key):
+        with self.lock:
+            choices = self.entries.get(key)
+            if choices is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return choices
+
+            if self.connection is not None:
+                row = self.connection.execute("SELECT choices FROM guess_cache WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self.connection.execute("UPDATE guess_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+                    choices = json.loads(row[0])
+                    self.remember(key, choices)
+                    self.shared_hits += 1
+                    return choices
+
+            self.misses += 1
+            return None
+
+    def put(self, key, choices):
+        with self.lock:
+            self.remember(key, choices)
+            if self.connection is not None:
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO guess_cache(key, choices, last_used) VALUES (?, ?, ?)",
+                    (key, json.dumps(choices), time.time())
+                )
+                # every put adds at most one row, so this removes at most the one least recently used row
+                self.connection.execute(
+                    "DELETE FROM guess_cache WHERE key IN ("
+                    "SELECT key FROM guess_cache ORDER BY last_used "
+                    "LIMIT MAX(0, (SELECT COUNT(*) FROM guess_cache) - ?))",
+                    (self.max_entries,)
+                )
+
+    # adds to the in-process LRU and drops the least recently used entry when it is full, the lock has to be held
+    def remember(self, key, choices):
+        self.entries[key] = choices
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    # hit and miss counters of this process, shared_hits are entries another process (or an earlier run) worked out
+    def report(self):
+        with self.lock:
+            requests = self.hits + self.shared_hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.shared_hits) / requests, 4) if requests > 0 else 0.0,
+            }
@@ -0,0 +1,158 @@
+# request timing for the Flask backend, served in the Prometheus text format by /metrics
+# every request is counted and timed per route, /generate_guess/ and /simulate/ are also timed per mode,
+# and the time a request spends in the solvers and in the database is timed separately with metrics.timer("solver") and metrics.timer("db")
+# sample_stacks is a sampling profiler for one-off captures of where the server spends its time, see /profile/ in backend_easier.py
+
+import collections
+import contextlib
+import sys
+import threading
+import time
+import types
+
+import flask
+
+# upper bounds of the latency histogram buckets in seconds, the last bucket is +Inf
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+class Histogram:
+    def __init__(self):
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        i = 0
+        while i < len(LATENCY_BUCKETS) and seconds > LATENCY_BUCKETS[i]:
+            i += 1
+        self.bucket_counts[i] += 1
+        self.sum += seconds
+        self.count += 1
+
+    # the _bucket, _sum and _count lines of the histogram, buckets are cumulative
+    def lines(self, name, labels):
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(LATENCY_BUCKETS + ("+Inf",), self.bucket_counts):
+            cumulative += bucket_count
+            lines.append(f"{name}_bucket{format_labels(labels + (('le', str(bound)),))} {cumulative}")
+        lines.append(f"{name}_sum{format_labels(labels)} {self.sum}")
+        lines.append(f"{name}_count{format_labels(labels)} {self.count}")
+        return lines
+
+
+# {route="/check_guess/",method="POST"}
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        # (route, method, status) -> number of requests
+        self.requests = collections.Counter()
+        # (route,) -> latency of the whole request
+        self.request_latency = collections.defaultdict(Histogram)
+        # (route, mode) -> latency of the whole request for the routes that play a mode
+        self.mode_latency = collections.defaultdict(Histogram)
+        # (phase, route) -> time a request spent in the phase, phase is solver or db
+        self.phase_latency = collections.defaultdict(Histogram)
+        # (mode,) -> latency of a single solver call
+        self.solver_latency = collections.defaultdict(Histogram)
+
+    # times every request of app, the times are recorded when the response is closed so streamed responses are timed until the end
+    def init_app(self, app):
+        app.before_request(self.start_request)
+        app.after_request(self.finish_request)
+
+    def start_request(self):
+        flask.g.metrics = {"start": time.perf_counter(), "mode": None, "solver": 0.0, "db": 0.0}
+
+    def finish_request(self, response):
+        request_metrics = flask.g.get("metrics")
+        if request_metrics is None:
+            return response
+        route = flask.request.url_rule.rule if flask.request.url_rule is not None else "unmatched"
+        method = flask.request.method
+        status = response.status_code
+
+        def record():
+            seconds = time.perf_counter() - request_metrics["start"]
+            with self.lock:
+                self.requests[(route, method, str(status))] += 1
+                self.request_latency[(route,)].observe(seconds)
+                if request_metrics["mode"] is not None:
+                    self.mode_latency[(route, request_metrics["mode"])].observe(seconds)
+                for phase in ("solver", "db"):
+                    self.phase_latency[(phase, route)].observe(request_metrics[phase])
+
+        response.call_on_close(record)
+        return response
+
+    # labels the current request with the mode it plays, only call this for modes the server knows about
+    def set_mode(self, mode):
+        if flask.has_request_context() and "metrics" in flask.g:
+            flask.g.metrics["mode"] = mode
+
+    # adds the time spent in the with block to phase ("solver" or "db") of the current request
+    # the with block gets an object whose seconds attribute is set to that time once the block is done
+    @contextlib.contextmanager
+    def timer(self, phase):
+        timing = types.SimpleNamespace(seconds=0.0)
+        start = time.perf_counter()
+        try:
+            yield timing
+        finally:
+            timing.seconds = time.perf_counter() - start
+            if flask.has_request_context() and "metrics" in flask.g:
+                flask.g.metrics[phase] += timing.seconds
+
+    # adds a single solver call of mode to the solver latency histogram
+    def observe_solver(self, mode, seconds):
+        with self.lock:
+            self.solver_latency[(mode,)].observe(seconds)
+
+    # everything in the Prometheus text exposition format
+    def render(self):
+        with self.lock:
+            lines = [
+                "# HELP wordle_requests_total Requests by route, method and status.",
+                "# TYPE wordle_requests_total counter",
+            ]
+            for (route, method, status), count in sorted(self.requests.items()):
+                lines.append(f"wordle_requests_total{format_labels((('route', route), ('method', method), ('status', status)))} {count}")
+
+            histograms = [
+                ("wordle_request_duration_seconds", "Time to serve a request by route.", ("route",), self.request_latency),
+                ("wordle_mode_request_duration_seconds", "Time to serve a request by route and mode.", ("route", "mode"), self.mode_latency),
+                ("wordle_request_phase_seconds", "Time a request spent in the solvers or the database.", ("phase", "route"), self.phase_latency),
+                ("wordle_solver_call_duration_seconds", "Time of a single solver call by mode.", ("mode",), self.solver_latency),
+            ]
+            for name, description, label_names, histogram_by_labels in histograms:
+                lines.append(f"# HELP {name} {description}")
+                lines.append(f"# TYPE {name} histogram")
+                for label_values, histogram in sorted(histogram_by_labels.items()):
+                    lines.extend(histogram.lines(name, tuple(zip(label_names, label_values))))
+        return "\n".join(lines) + "\n"
+
+
+# samples the stack of every other thread every interval seconds for seconds seconds
+# returns the samples in the collapsed stack format ("outermost;...;innermost count" per line) that flamegraph.pl and speedscope read
+def sample_stacks(seconds, interval=0.005):
+    own_thread = threading.get_ident()
+    stacks = collections.Counter()
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_thread:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(f"{frame.f_code.co_name} ({frame.f_code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})")
+                frame = frame.f_back
+            stacks[";".join(reversed(stack))] += 1
+        time.sleep(interval)
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
@@ -0,0 +1,65 @@
+# server side game sessions keyed by a game id
+# every game started by the frontend gets a GameState (see wordle/game_state.py) that is narrowed down as guesses are checked,
+# so /generate_guess/ only does the work for the newest guess instead of replaying the whole history on every request
+# any object with get, put, delete and report methods can be used as the store by setting app.config["GAME_SESSIONS"],
+# e.g. a plain dictionary stand-in in tests
+
+import collections
+import threading
+import time
+
+
+# in-process store that keeps at most max_games games and drops games that haven't been used in ttl seconds
+# the least recently used game is dropped first when the store is full
+# safe to share between the threads of a threaded Flask server, every method holds the lock while it touches games
+class LRUSessionStore:
+    def __init__(self, max_games=1000, ttl=60 * 60, clock=time.monotonic):
+        self.max_games = max_games
+        self.ttl = ttl
+        self.clock = clock
+        # game_id -> (last used time, game state), least recently used first
+        self.games = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, game_id):
+        with self.lock:
+            self.evict_expired()
+            entry = self.games.get(game_id)
+            if entry is None:
+                return None
+            self.games[game_id] = (self.clock(), entry[1])
+            self.games.move_to_end(game_id)
+            return entry[1]
+
+    def put(self, game_id, game_state):
+        with self.lock:
+            self.evict_expired()
+            self.games[game_id] = (self.clock(), game_state)
+            self.games.move_to_end(game_id)
+            while len(self.games) > self.max_games:
+                self.games.popitem(last=False)
+
+    def delete(self, game_id):
+        with self.lock:
+            self.games.pop(game_id, None)
+
+    # games are ordered by when they were last used, so expired games are always at the front, the lock has to be held
+    def evict_expired(self):
+        now = self.clock()
+        while self.games and now - next(iter(self.games.values()))[0] > self.ttl:
+            self.games.popitem(last=False)
+
+    # number of live games and how much memory their game states use
+    # the game states are measured from a snapshot taken under the lock, so requests aren't blocked while they are measured
+    def report(self):
+        with self.lock:
+            self.evict_expired()
+            game_states = [game_state for _, game_state in self.games.values()]
+        game_bytes = [game_state.nbytes() for game_state in game_states]
+        return {
+            "live_games": len(game_states),
+            "max_games": self.max_games,
+            "ttl": self.ttl,
+            "total_bytes": sum(game_bytes),
+            "max_game_bytes": max(game_bytes, default=0),
+        }
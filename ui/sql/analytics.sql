@@ -0,0 +1,53 @@
+/*
+adds the analytics index, the mode_stats_hourly table and the stats_rollup_hourly trigger from schema.sql to an existing db
+and fills mode_stats_hourly from the games already in stats
+it also drops the stats(mode, num_guesses) index older versions of this file added, no query uses it
+sqlite3 db.sqlite3 < sql/analytics.sql
+it can be run again at any time, mode_stats_hourly is rebuilt from stats every time
+*/
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS stats_mode_completed ON stats(mode, completed);
+DROP INDEX IF EXISTS stats_mode_num_guesses;
+
+CREATE TABLE IF NOT EXISTS mode_stats_hourly(
+    mode VARCHAR(40) NOT NULL,
+    hour DATETIME NOT NULL,
+    games INTEGER NOT NULL DEFAULT 0,
+    wins INTEGER NOT NULL DEFAULT 0,
+    total_guesses INTEGER NOT NULL DEFAULT 0,
+    guesses_1 INTEGER NOT NULL DEFAULT 0,
+    guesses_2 INTEGER NOT NULL DEFAULT 0,
+    guesses_3 INTEGER NOT NULL DEFAULT 0,
+    guesses_4 INTEGER NOT NULL DEFAULT 0,
+    guesses_5 INTEGER NOT NULL DEFAULT 0,
+    guesses_6 INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (mode, hour)
+);
+
+CREATE TRIGGER IF NOT EXISTS stats_rollup_hourly AFTER INSERT ON stats
+BEGIN
+    INSERT OR IGNORE INTO mode_stats_hourly(mode, hour) VALUES (NEW.mode, strftime('%Y-%m-%d %H:00:00', NEW.completed));
+    UPDATE mode_stats_hourly SET
+        games = games + 1,
+        wins = wins + NEW.win,
+        total_guesses = total_guesses + NEW.num_guesses,
+        guesses_1 = guesses_1 + (NEW.num_guesses = 1),
+        guesses_2 = guesses_2 + (NEW.num_guesses = 2),
+        guesses_3 = guesses_3 + (NEW.num_guesses = 3),
+        guesses_4 = guesses_4 + (NEW.num_guesses = 4),
+        guesses_5 = guesses_5 + (NEW.num_guesses = 5),
+        guesses_6 = guesses_6 + (NEW.num_guesses = 6)
+    WHERE mode = NEW.mode AND hour = strftime('%Y-%m-%d %H:00:00', NEW.completed);
+END;
+
+DELETE FROM mode_stats_hourly;
+
+INSERT INTO mode_stats_hourly(mode, hour, games, wins, total_guesses, guesses_1, guesses_2, guesses_3, guesses_4, guesses_5, guesses_6)
+SELECT mode, strftime('%Y-%m-%d %H:00:00', completed), COUNT(*), SUM(win), SUM(num_guesses),
+    SUM(num_guesses = 1), SUM(num_guesses = 2), SUM(num_guesses = 3),
+    SUM(num_guesses = 4), SUM(num_guesses = 5), SUM(num_guesses = 6)
+FROM stats
+GROUP BY mode, strftime('%Y-%m-%d %H:00:00', completed);
+
+COMMIT;
\ No newline at end of file
@@ -0,0 +1,46 @@
+/*
+adds the mode_stats table and the stats_rollup trigger from schema.sql to an existing db and fills mode_stats from the games already in stats
+sqlite3 db.sqlite3 < sql/mode_stats.sql
+it can be run again at any time, mode_stats is rebuilt from stats every time
+*/
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS mode_stats(
+    mode VARCHAR(40) PRIMARY KEY,
+    games INTEGER NOT NULL DEFAULT 0,
+    wins INTEGER NOT NULL DEFAULT 0,
+    total_guesses INTEGER NOT NULL DEFAULT 0,
+    guesses_1 INTEGER NOT NULL DEFAULT 0,
+    guesses_2 INTEGER NOT NULL DEFAULT 0,
+    guesses_3 INTEGER NOT NULL DEFAULT 0,
+    guesses_4 INTEGER NOT NULL DEFAULT 0,
+    guesses_5 INTEGER NOT NULL DEFAULT 0,
+    guesses_6 INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TRIGGER IF NOT EXISTS stats_rollup AFTER INSERT ON stats
+BEGIN
+    INSERT OR IGNORE INTO mode_stats(mode) VALUES (NEW.mode);
+    UPDATE mode_stats SET
+        games = games + 1,
+        wins = wins + NEW.win,
+        total_guesses = total_guesses + NEW.num_guesses,
+        guesses_1 = guesses_1 + (NEW.num_guesses = 1),
+        guesses_2 = guesses_2 + (NEW.num_guesses = 2),
+        guesses_3 = guesses_3 + (NEW.num_guesses = 3),
+        guesses_4 = guesses_4 + (NEW.num_guesses = 4),
+        guesses_5 = guesses_5 + (NEW.num_guesses = 5),
+        guesses_6 = guesses_6 + (NEW.num_guesses = 6)
+    WHERE mode = NEW.mode;
+END;
+
+DELETE FROM mode_stats;
+
+INSERT INTO mode_stats(mode, games, wins, total_guesses, guesses_1, guesses_2, guesses_3, guesses_4, guesses_5, guesses_6)
+SELECT mode, COUNT(*), SUM(win), SUM(num_guesses),
+    SUM(num_guesses = 1), SUM(num_guesses = 2), SUM(num_guesses = 3),
+    SUM(num_guesses = 4), SUM(num_guesses = 5), SUM(num_guesses = 6)
+FROM stats
+GROUP BY mode;
+
+COMMIT;
\ No newline at end of file
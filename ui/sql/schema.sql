@@ -4,8 +4,9 @@ PRAGMA foreign_keys = ON;
 /*
 stats table
 mode, has to be one of the modes you define. 
-Currently must be one of [user, only_matched_patterns, letter_frequency, entropy, tfidf], but you can add to this list
+Currently must be one of [user, only_matched_patterns, letter_frequency, entropy, tfidf, decision_tree, minimax, minimax_lookahead], but you can add to this list
 if you implement your own algorithms or want to use different naming schemes.
+Games played in hard mode are stored with _hard after the mode, i.e. entropy_hard.
 
 win, using an integer to represent true/false. 1 means this game was won, 0 means it was lost
 num_guesses is the number of guesses used for this game. If the game was not won, the number of guesses should be 6
@@ -18,4 +19,96 @@ CREATE TABLE stats(
     win INTEGER NOT NULL,
     num_guesses INTEGER NOT NULL,
     completed DATETIME DEFAULT CURRENT_TIMESTAMP
-);
\ No newline at end of file
+);
+
+/*
+mode_stats table
+one row per mode with the totals of all its games in stats, so the stats of every mode are read without going over the whole stats table
+kept up to date by the stats_rollup trigger, in the same transaction as every insert into stats
+games is the number of games, wins and total_guesses are the sums of win and num_guesses over those games
+guesses_1 to guesses_6 count the games that used that many guesses, lost games count towards guesses_6
+
+databases created before mode_stats was added can get it with sqlite3 db.sqlite3 < sql/mode_stats.sql
+*/
+CREATE TABLE mode_stats(
+    mode VARCHAR(40) PRIMARY KEY,
+    games INTEGER NOT NULL DEFAULT 0,
+    wins INTEGER NOT NULL DEFAULT 0,
+    total_guesses INTEGER NOT NULL DEFAULT 0,
+    guesses_1 INTEGER NOT NULL DEFAULT 0,
+    guesses_2 INTEGER NOT NULL DEFAULT 0,
+    guesses_3 INTEGER NOT NULL DEFAULT 0,
+    guesses_4 INTEGER NOT NULL DEFAULT 0,
+    guesses_5 INTEGER NOT NULL DEFAULT 0,
+    guesses_6 INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TRIGGER stats_rollup AFTER INSERT ON stats
+BEGIN
+    INSERT OR IGNORE INTO mode_stats(mode) VALUES (NEW.mode);
+    UPDATE mode_stats SET
+        games = games + 1,
+        wins = wins + NEW.win,
+        total_guesses = total_guesses + NEW.num_guesses,
+        guesses_1 = guesses_1 + (NEW.num_guesses = 1),
+        guesses_2 = guesses_2 + (NEW.num_guesses = 2),
+        guesses_3 = guesses_3 + (NEW.num_guesses = 3),
+        guesses_4 = guesses_4 + (NEW.num_guesses = 4),
+        guesses_5 = guesses_5 + (NEW.num_guesses = 5),
+        guesses_6 = guesses_6 + (NEW.num_guesses = 6)
+    WHERE mode = NEW.mode;
+END;
+
+/*
+index for the /analytics/ routes: the games of a mode in a time range, for the part of a window that doesn't start on a full hour
+the number of guesses distribution comes from the guesses_1 to guesses_6 columns of the rollups, so it doesn't need an index on stats
+
+mode_stats_hourly table
+the same totals as mode_stats, but for every hour (UTC) a mode was played in. hour is the start of the hour, i.e. 2023-10-01 14:00:00
+kept up to date by the stats_rollup_hourly trigger, so time windows are summed over at most one row per hour instead of every game
+
+databases created before these were added can get them with sqlite3 db.sqlite3 < sql/analytics.sql
+*/
+CREATE INDEX stats_mode_completed ON stats(mode, completed);
+
+CREATE TABLE mode_stats_hourly(
+    mode VARCHAR(40) NOT NULL,
+    hour DATETIME NOT NULL,
+    games INTEGER NOT NULL DEFAULT 0,
+    wins INTEGER NOT NULL DEFAULT 0,
+    total_guesses INTEGER NOT NULL DEFAULT 0,
+    guesses_1 INTEGER NOT NULL DEFAULT 0,
+    guesses_2 INTEGER NOT NULL DEFAULT 0,
+    guesses_3 INTEGER NOT NULL DEFAULT 0,
+    guesses_4 INTEGER NOT NULL DEFAULT 0,
+    guesses_5 INTEGER NOT NULL DEFAULT 0,
+    guesses_6 INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (mode, hour)
+);
+
+CREATE TRIGGER stats_rollup_hourly AFTER INSERT ON stats
+BEGIN
+    INSERT OR IGNORE INTO mode_stats_hourly(mode, hour) VALUES (NEW.mode, strftime('%Y-%m-%d %H:00:00', NEW.completed));
+    UPDATE mode_stats_hourly SET
+        games = games + 1,
+        wins = wins + NEW.win,
+        total_guesses = total_guesses + NEW.num_guesses,
+        guesses_1 = guesses_1 + (NEW.num_guesses = 1),
+        guesses_2 = guesses_2 + (NEW.num_guesses = 2),
+        guesses_3 = guesses_3 + (NEW.num_guesses = 3),
+        guesses_4 = guesses_4 + (NEW.num_guesses = 4),
+        guesses_5 = guesses_5 + (NEW.num_guesses = 5),
+        guesses_6 = guesses_6 + (NEW.num_guesses = 6)
+    WHERE mode = NEW.mode AND hour = strftime('%Y-%m-%d %H:00:00', NEW.completed);
+END;
+
+/*
+stats_writer_batches table
+the number of the last batch of games every stats writer (see stats_writer.py) committed, written in the same transaction as the games
+so the games the writer still holds in memory can be added to the stats without counting a game twice
+writer is a random id per process of the app. The stats writer creates this table in databases created before it was added
+*/
+CREATE TABLE stats_writer_batches(
+    writer VARCHAR(32) PRIMARY KEY,
+    last_batch INTEGER NOT NULL
+);
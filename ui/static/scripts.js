@@ -8,6 +8,13 @@ let guess_feedback = [];
 // current_solution_index is a random number corresponding to an index in the solution list in Flask
 let current_solution_index = 0;
 
+// current_game_id identifies the server side session of the game, which keeps the solutions that are still possible
+let current_game_id = "";
+
+// whether the current game is played in hard mode, where every guess has to be a word that could still be the solution
+// the hard mode checkbox only takes effect when a new game starts
+let current_hard_mode = false;
+
 reset_board();
 
 function change_mode() {
@@ -59,7 +66,7 @@ function submit_user_input() {
         return;
     }
     let guess = user_input.value.toUpperCase();
-    fetch("/check_guess/?index=" + current_solution_index.toString() + "&guess=" + guess,
+    fetch("/check_guess/?index=" + current_solution_index.toString() + "&guess=" + guess + "&game_id=" + current_game_id,
           { credentials: "same-origin", method: "POST" })
         .then((response) => {
             if (!response.ok) throw Error(response.statusText);
@@ -85,42 +92,78 @@ function submit_user_input() {
 async function simulate() {
     // simulate using the current mode num_simulate times
     // can only call this function when the mode is not user
+    // all games are played by the server in a single request, which streams back its progress and the final stats
     let num_simulate = Number(document.getElementById("num-simulate").value);
+    let num_replays = Number(document.getElementById("num-replays").value);
     let mode = document.getElementById("curr-mode").textContent;
-    for (let i = 0; i < num_simulate; ++i) {
-        // start a new game
-        reset_board();
+    let progress = document.getElementById("simulate-progress");
+
+    // start a new game so the current game is stored before the board is used for replays
+    reset_board();
+
+    const response = await fetch("/simulate/?mode=" + mode + "&num_games=" + num_simulate.toString() + "&num_replays=" + num_replays.toString()
+                                 + "&hard_mode=" + Number(current_hard_mode).toString(),
+                                 { credentials: "same-origin", method: "POST" });
+    if (!response.ok) {
+        progress.textContent = "Could not simulate " + mode;
+        return;
+    }
+
+    // every line of the response is a JSON object, the last one has the final stats
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+    let result = null;
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        let lines = buffer.split("\n");
+        buffer = lines.pop();
+        for (const line of lines) {
+            result = JSON.parse(line);
+            progress.textContent = result.completed.toString() + " / " + result.num_games.toString() + " games";
+        }
+    }
+    progress.textContent += " - Win Rate: " + result.win_rate.toFixed(2) + ", Avg Guesses: " + result.avg_guesses.toFixed(2);
+    update_stats(result.modes);
 
-        // use while loop, since initial guesses can increase the guess amount
-        while (current_guesses.length < NUM_GUESSES) {
-            // generate a next guess
-            const { guess } = await fetch("/generate_guess/", {credentials: "same-origin",
-                                                         method: "POST",
-                                                         body: JSON.stringify({mode, current_guesses, guess_feedback})})
-                                        .then((response) => {
-                                            if (!response.ok) throw Error(response.statusText);
-                                            return response.json();
-                                        })
-                                        .catch((error) => console.log(error));
-            // get feedback for the next guess
-            const { feedback } = await fetch("/check_guess/?index=" + current_solution_index.toString() + "&guess=" + guess,
-                                             { credentials: "same-origin", method: "POST" })
-                                            .then((response) => {
-                                                if (!response.ok) throw Error(response.statusText);
-                                                return response.json();
-                                            })
-                                            .catch((error) => console.log(error));
-
-            current_guesses.push(guess);
-            guess_feedback.push(feedback);
+    // show the sampled games on the board, these are already in the db so the board is cleared without storing them
+    for (const replay of result.replays) {
+        clear_board();
+        current_guesses = [];
+        guess_feedback = [];
+        for (let i = 0; i < replay.current_guesses.length; ++i) {
+            current_guesses.push(replay.current_guesses[i]);
+            guess_feedback.push(replay.guess_feedback[i]);
             insert_letters();
-            
-            // currently delaying 2 seconds per iteration
-            //await new Promise(r => setTimeout(r, 2000));
-            
-            if (guess_feedback[guess_feedback.length - 1] === "CCCCC") {
-                break;
-            }
+            await new Promise(r => setTimeout(r, 500));
+        }
+        await new Promise(r => setTimeout(r, 1500));
+    }
+    current_guesses = [];
+    guess_feedback = [];
+}
+
+function update_stats(modes) {
+    let stats_list = document.getElementById("stats-list");
+    // overwrite stats list with new data
+    stats_list.innerHTML = modes.map(({mode, win_rate, avg_guesses}) => {
+        return '<div class="stats-line" key="' + mode + '">'
+                + '<span class="mode-stat">' + mode + '</span>'
+                + '<span class="win-rate">Win Rate: ' + win_rate.toFixed(2) + '</span>'
+                + '<span class="avg-guesses">Avg Guesses: ' + avg_guesses.toFixed(2) + '</span>'
+                + '</div>'
+    }).join("");
+}
+
+function clear_board() {
+    // clear colors of all letters in the game board and remove letters
+    for (let row = 0; row < NUM_GUESSES; ++row) {
+        for (let col = 0; col < WORD_LENGTH; ++col) {
+            let curr_letter = document.getElementById(row.toString() + col.toString());
+            curr_letter.className = "letter";
+            curr_letter.textContent = "";
         }
     }
 }
@@ -130,36 +173,29 @@ function reset_board() {
     if (current_guesses.length >= NUM_GUESSES || guess_feedback[guess_feedback.length - 1] === "CCCCC") {
         // store the data in db and update stats
         let win = Number(guess_feedback[guess_feedback.length - 1] === "CCCCC");
-        fetch("/insert_stat/?win=" + win.toString() + "&num_guesses=" + current_guesses.length.toString() + "&mode=" + mode,
+        fetch("/insert_stat/?win=" + win.toString() + "&num_guesses=" + current_guesses.length.toString() + "&mode=" + mode
+              + "&hard_mode=" + Number(current_hard_mode).toString(),
               { credentials: "same-origin", method: "POST" })
             .then((response) => {
                 if (!response.ok) throw Error(response.statusText);
                 return response.json();
             })
-            .then(({ modes }) => {
-                let stats_list = document.getElementById("stats-list");
-                // overwrite stats list with new data
-                stats_list.innerHTML = modes.map(({mode, win_rate, avg_guesses}) => {
-                    return '<div class="stats-line" key="' + mode + '">'
-                            + '<span class="mode-stat">' + mode + '</span>'
-                            + '<span class="win-rate">Win Rate: ' + win_rate.toFixed(2) + '</span>'
-                            + '<span class="avg-guesses">Avg Guesses: ' + avg_guesses.toFixed(2) + '</span>'
-                            + '</div>'
-                }).join("");
-            })
+            .then(({ modes }) => update_stats(modes))
             .catch((error) => console.log(error));
     }
     current_guesses = [];
     guess_feedback = [];
+    current_hard_mode = document.getElementById("hard-mode").checked;
 
     // need to query the api for this number
-    fetch("/get_solution_index/", { credentials: "same-origin", method: "GET" })
+    fetch("/get_solution_index/?hard_mode=" + Number(current_hard_mode).toString(), { credentials: "same-origin", method: "GET" })
         .then((response) => {
             if (!response.ok) throw Error(response.statusText);
             return response.json();
         })
         .then((data) => {
             current_solution_index = data.index;
+            current_game_id = data.game_id;
         })
         .catch((error) => console.log(error));
     // clear the top words section
@@ -170,12 +206,5 @@ function reset_board() {
 
     document.getElementById("modes").value = mode;
 
-    // clear colors of all letters in the game board and remove letters
-    for (let row = 0; row < NUM_GUESSES; ++row) {
-        for (let col = 0; col < WORD_LENGTH; ++col) {
-            let curr_letter = document.getElementById(row.toString() + col.toString());
-            curr_letter.className = "letter";
-            curr_letter.textContent = "";
-        }
-    }
+    clear_board();
 }
\ No newline at end of file
@@ -0,0 +1,232 @@
+# writes finished games into the stats table from a background thread
+# every /insert_stat/ used to be its own transaction on a new connection, so under simulation load every game waited on a disk sync
+# here games are put on a bounded queue and written by one thread with one connection, many games per transaction, in WAL mode
+# so the requests reading the stats aren't blocked by the writes
+# games that aren't written yet are kept as per-mode totals, get_stats adds them to mode_stats so the stats stay exact
+# a batch that can't be written because the database is busy or locked is retried with backoff, its games stay in the totals until then
+#
+# every batch gets a number, and the number of the last batch this writer committed is stored in the stats_writer_batches table
+# in the same transaction as its games. Batches are committed without holding the lock, so a reader can't tell from the lock alone
+# whether a batch is in what it read from the database. unwritten_stats reads that number in the same read transaction
+# as the stats, then only adds the batches with a bigger number, so no game is counted twice or missed
+
+import atexit
+import collections
+import contextlib
+import logging
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+# number of guesses a game can take, the totals keep a histogram like the guesses_1 to guesses_6 columns of mode_stats
+NUM_GUESSES = 6
+
+# committed batches kept in memory for readers whose read transaction started before they were committed
+BATCH_HISTORY = 64
+
+# the errors that mean another connection is writing, everything else (a missing table, a read-only file, ...) won't go away by retrying
+RETRY_ERROR_CODES = {sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED}
+
+logger = logging.getLogger(__name__)
+
+
+class StatsWriter:
+    # at most batch_size games are written per transaction, and a game waits at most flush_interval seconds for more games to join it
+    # add blocks while max_queue games are waiting to be written
+    # a batch that fails because the database is busy is retried after retry_delay seconds, doubling every time up to max_retry_delay
+    def __init__(self, path, batch_size=1000, flush_interval=0.25, max_queue=100000, retry_delay=0.5, max_retry_delay=30):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+
+        # this writer's row in stats_writer_batches, every process of the app has its own writer and its own unwritten games
+        self.writer_id = uuid.uuid4().hex
+
+        # mode -> [games, wins, total_guesses, guesses_1, ..., guesses_6] of the games that are queued but not in a batch yet
+        self.queued = {}
+        # batch number -> the same totals for the games of the batch, for the batch being written and the last BATCH_HISTORY
+        # committed batches. pruned_through is the number of the last committed batch that was dropped from here
+        self.batches = collections.OrderedDict()
+        self.pruned_through = 0
+        self.next_batch = 1
+        # the lock is only held to move games between these totals, never while the database is used
+        self.lock = threading.Lock()
+
+        self.thread = None
+        self.start_lock = threading.Lock()
+
+    # queues (mode, win, num_guesses) rows, the completed time is the time they were queued
+    def add(self, rows):
+        self.start()
+        completed = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
+        for mode, win, num_guesses in rows:
+            with self.lock:
+                totals = self.queued.setdefault(mode, [0] * (3 + NUM_GUESSES))
+                add_game(totals, win, num_guesses, 1)
+            self.queue.put((mode, win, num_guesses, completed))
+
+    # the per-mode totals of the games that aren't in connection's view of the database yet
+    # the stats have to be read from connection inside the with block, which holds a read transaction so every read sees the same data
+    @contextlib.contextmanager
+    def unwritten_stats(self, connection):
+        own_transaction = not connection.in_transaction
+        if own_transaction:
+            connection.execute("BEGIN")
+        try:
+            while True:
+                last_batch = self.last_committed_batch(connection)
+                with self.lock:
+                    if last_batch >= self.pruned_through:
+                        unwritten = {mode: totals.copy() for mode, totals in self.queued.items()}
+                        for batch, batch_totals in self.batches.items():
+                            if batch > last_batch:
+                                for mode, totals in batch_totals.items():
+                                    add_totals(unwritten.setdefault(mode, [0] * (3 + NUM_GUESSES)), totals)
+                        break
+                # batches committed after the read transaction started were already dropped, start a newer one
+                if not own_transaction:
+                    raise RuntimeError("the stats were read in a transaction that is too old for the unwritten games")
+                connection.commit()
+                connection.execute("BEGIN")
+            yield unwritten
+        finally:
+            if own_transaction:
+                connection.commit()
+
+    # the number of the last batch this writer committed as connection sees the database, 0 if it hasn't committed any
+    # looking the table up is the first read of the transaction, so the rest of the transaction sees the database as it was here
+    # the table is missing until the writer has started on databases created before it was added, so nothing was committed either
+    def last_committed_batch(self, connection):
+        cursor = connection.cursor()
+        cursor.row_factory = None
+        if cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'stats_writer_batches'").fetchone() is None:
+            return 0
+        row = cursor.execute("SELECT last_batch FROM stats_writer_batches WHERE writer = ?", (self.writer_id,)).fetchone()
+        return 0 if row is None else row[0]
+
+    # waits until every game queued so far is written
+    def flush(self):
+        self.queue.join()
+
+    # writes the games that are left and stops the thread, called when the app shuts down
+    def close(self):
+        if self.thread is not None and self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+
+    # creates stats_writer_batches before the first game is queued, so readers can always read it
+    # it is in schema.sql too, this is for databases created before it was added
+    def start(self):
+        with self.start_lock:
+            if self.thread is None:
+                connection = sqlite3.connect(str(self.path))
+                try:
+                    with connection:
+                        connection.execute("CREATE TABLE IF NOT EXISTS stats_writer_batches("
+                                           "writer VARCHAR(32) PRIMARY KEY, last_batch INTEGER NOT NULL)")
+                except sqlite3.Error:
+                    # the batches will fail to write as well and be logged there
+                    logger.exception("Could not create the stats_writer_batches table")
+                connection.close()
+                self.thread = threading.Thread(target=self.run, name="stats-writer", daemon=True)
+                self.thread.start()
+                atexit.register(self.close)
+
+    def run(self):
+        connection = sqlite3.connect(str(self.path))
+        # WAL lets readers keep going during a write, synchronous NORMAL only syncs at checkpoints instead of every commit
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = NORMAL")
+        connection.execute("PRAGMA busy_timeout = 5000")
+
+        running = True
+        while running:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while batch[-1] is not None and len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get(timeout=max(0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+
+            if batch[-1] is None:
+                running = False
+            rows = [row for row in batch if row is not None]
+
+            if rows:
+                batch_number = self.start_batch(rows)
+                # the games stay in the batch's totals until they are committed, flush keeps waiting while they are retried
+                # when the app is shutting down there is no one left to wait for, so a failed batch is only tried once
+                delay = self.retry_delay
+                while not self.write(connection, rows, batch_number) and running:
+                    time.sleep(delay)
+                    delay = min(delay * 2, self.max_retry_delay)
+
+            for _ in batch:
+                self.queue.task_done()
+        connection.close()
+
+    # moves the games of rows from the queued totals to a new batch and returns its number
+    def start_batch(self, rows):
+        batch_totals = {}
+        for mode, win, num_guesses, _ in rows:
+            add_game(batch_totals.setdefault(mode, [0] * (3 + NUM_GUESSES)), win, num_guesses, 1)
+        with self.lock:
+            batch_number = self.next_batch
+            self.next_batch += 1
+            self.batches[batch_number] = batch_totals
+            for mode, totals in batch_totals.items():
+                subtract_totals(self.queued[mode], totals)
+                if self.queued[mode][0] == 0:
+                    del self.queued[mode]
+        return batch_number
+
+    # inserts rows and the batch number in one transaction, returns False if the batch should be tried again
+    # the batch is kept for readers that started before the commit, a batch that can't ever be written is dropped
+    def write(self, connection, rows, batch_number):
+        try:
+            with connection:
+                connection.executemany(
+                    "INSERT INTO stats(mode, win, num_guesses, completed) "
+                    "VALUES (?, ?, ?, ?) ",
+                    rows
+                )
+                connection.execute("INSERT OR REPLACE INTO stats_writer_batches(writer, last_batch) VALUES (?, ?)",
+                                   (self.writer_id, batch_number))
+        except sqlite3.Error as error:
+            if getattr(error, "sqlite_errorcode", None) in RETRY_ERROR_CODES:
+                logger.warning("Could not write %d games to the stats table, retrying: %s", len(rows), error)
+                return False
+            logger.exception("Dropping %d games that can't be written to the stats table", len(rows))
+            with self.lock:
+                del self.batches[batch_number]
+            return True
+
+        with self.lock:
+            while len(self.batches) > BATCH_HISTORY:
+                self.pruned_through, _ = self.batches.popitem(last=False)
+        return True
+
+
+# adds (sign=1) or removes (sign=-1) a game from [games, wins, total_guesses, guesses_1, ..., guesses_6]
+def add_game(totals, win, num_guesses, sign):
+    totals[0] += sign
+    totals[1] += sign * win
+    totals[2] += sign * num_guesses
+    if 1 <= num_guesses <= NUM_GUESSES:
+        totals[2 + num_guesses] += sign
+
+
+def add_totals(totals, other):
+    for i, value in enumerate(other):
+        totals[i] += value
+
+
+def subtract_totals(totals, other):
+    for i, value in enumerate(other):
+        totals[i] -= value
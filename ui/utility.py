@@ -1,14 +1,29 @@
 # contains utility functions and other useful things
 
+import pathlib
+import sys
+
+# the word lists and the precomputed feedback matrix live in the wordle folder and are shared with the Wordle class
+# words.py loads the word lists once per process
+sys.path.append(str(pathlib.Path(__file__).parent.parent / "wordle"))
+from words import VALID_GUESSES, VALID_SOLUTIONS, GUESS_SET, SOLUTION_SET, GUESS_INDEX, SOLUTION_INDEX
+from feedback_matrix import (PATTERN_STRINGS, encode_feedback, decode_feedback, get_feedback, get_feedback_code, batch_feedback,
+                             matching_solutions)
+import letter_masks
+from opening_book import get_book_guess
+
 WORD_LENGTH = 5
 NUM_GUESSES = 6
 
 # checks if a guess is valid. Current guess has to be WORD_LENGTH in length, all letters, and in valid_guesses
+# pass in GUESS_SET from words.py so the membership check is constant time
 def is_valid_guess(current_guess: str, VALID_GUESSES) -> bool:
     return len(current_guess) == WORD_LENGTH and current_guess.isalpha() and current_guess.upper() in VALID_GUESSES
 
 
 # generates feedback for current guess
+# this is the reference implementation, get_feedback returns the same string from the precomputed feedback matrix
+# and batch_feedback compares one guess with a whole list of solutions at once
 def generate_feedback(current_guess, current_solution):
     # using an array because strings are immutable in Python
     feedback = ["W"] * WORD_LENGTH
@@ -45,42 +60,5 @@ def filter_on_feedback(current_guesses, guess_feedback, VALID_GUESSES):
     # it's hard to eliminate other letters as there are only 2 more spots left
     # We will let individual algorithms handle what to do with the green tiles
 
-    filtered_guesses = []
-
-    # keeps an array of all letters that shouldn't be in that position
-    # this means either letters that are wrong (these letters should be added to all letter positions)
-    # or letters that are misplaced for this position
-    letter_not_in_position = [set() for i in range(WORD_LENGTH)]
-    # helps in cases where a word has multiple of the same letter
-    not_wrong_letters = set()
-
-    # need separate for loops because words with multiple of the same letter would have that letter be propogated to all positions
-    for guess, feedback in zip(current_guesses, guess_feedback):
-        for i in range(WORD_LENGTH):
-            if feedback[i] == "M":
-                letter_not_in_position[i].add(guess[i])
-                not_wrong_letters.add(guess[i])
-            elif feedback[i] == "C":
-                # read the description above for why we don't do anything else with correct letters
-                not_wrong_letters.add(guess[i])
-    for guess, feedback in zip(current_guesses, guess_feedback):
-        for i in range(WORD_LENGTH):
-            if feedback[i] == "W":
-                if guess[i] in not_wrong_letters:
-                    letter_not_in_position[i].add(guess[i])
-            else:
-                # propagate to all positions, since letter cannot be in word at all
-                for j in range(WORD_LENGTH):
-                    letter_not_in_position[j].add(guess[i])
-
-    # now go through the list of guesses and append to filtered guesses if no letters in word at that position are in letter_not_in_position
-    for word in VALID_GUESSES:
-        valid = True
-        for i in range(WORD_LENGTH):
-            if word[i] in letter_not_in_position[i]:
-                valid = False
-                break
-        if valid:
-            filtered_guesses.append(word)
-
-    return filtered_guesses
\ No newline at end of file
+    # shared with the Wordle class, checks precomputed per-position letter bitmasks instead of every letter of every word
+    return letter_masks.filter_on_feedback(current_guesses, guess_feedback, VALID_GUESSES)
\ No newline at end of file
@@ -0,0 +1,226 @@
+# benchmarks for the hot paths: feedback, filter_on_feedback, the solvers behind every mode in ui/algorithms.py and full evaluations
+# every input is drawn from a seeded random number generator, so every run measures the same work
+# run it from the wordle folder:
+#   python benchmark.py                                   runs everything and writes benchmark_results.json
+#   python benchmark.py --baseline benchmark_baseline.json  also fails if a metric is more than --tolerance worse than the baseline
+#   python benchmark.py --save-baseline                   writes the results to benchmark_baseline.json instead
+# the stored baseline was measured on one machine, save a new one before comparing on another machine
+# the decision_tree modes use an entropy tree built at the start of every run (a few seconds), not decision_tree.npz,
+# so a fresh checkout measures the same tree as the baseline
+
+import argparse
+import json
+import pathlib
+import platform
+import random
+import sys
+import time
+
+import numpy as np
+
+from words import VALID_GUESSES, VALID_SOLUTIONS
+from feedback_matrix import batch_feedback, get_feedback, get_feedback_matrix
+from letter_masks import filter_on_feedback
+from opening_book import BOOK_MODES, get_book_guess
+from wordle_solution import Wordle
+import solvers
+import decision_tree
+import tfidf
+
+# the modes in ui/algorithms.py, which is imported from the ui folder
+sys.path.append(str(pathlib.Path(__file__).parent.parent / "ui"))
+import algorithms
+
+BENCHMARK_DIR = pathlib.Path(__file__).parent
+RESULTS_PATH = BENCHMARK_DIR / "benchmark_results.json"
+BASELINE_PATH = BENCHMARK_DIR / "benchmark_baseline.json"
+
+# mode -> function with the (current_guesses, guess_feedback, valid_solutions) arguments of ui/algorithms.py
+SOLVER_MODES = {
+  "only_matched_patterns": algorithms.only_matched_patterns,
+  "letter_frequency": algorithms.letter_frequency,
+  "entropy": algorithms.entropy,
+  "tfidf": algorithms.tfidf,
+  "decision_tree": algorithms.decision_tree,
+  "minimax": algorithms.minimax,
+  "minimax_lookahead": algorithms.minimax_lookahead,
+}
+
+# mode -> input_function for Wordle, played on every solution by the evaluation benchmark
+EVALUATION_MODES = {
+  "letter_frequency": solvers.letter_frequency,
+  "entropy": solvers.entropy,
+  "tfidf": tfidf.tfidf,
+  "decision_tree": decision_tree.decision_tree_guess,
+  "minimax": solvers.minimax,
+}
+
+# history depths filter_on_feedback is timed at
+FILTER_DEPTHS = [1, 2, 3, 4, 5]
+
+# times that got slower by less than this many milliseconds are never regressions, sub-millisecond turns are mostly timer noise
+MIN_TIME_CHANGE_MS = 0.25
+
+
+# calls function until min_time seconds have passed, returns the number of calls per second
+def calls_per_second(function, min_time) -> float:
+  calls = 0
+  start = time.perf_counter()
+  while True:
+    function()
+    calls += 1
+    elapsed = time.perf_counter() - start
+    if elapsed >= min_time:
+      return calls / elapsed
+
+
+# a random game history of depth guesses against a random solution
+def random_history(rng, depth) -> tuple[list[str], list[str]]:
+  solution = rng.choice(VALID_SOLUTIONS)
+  current_guesses = [rng.choice(VALID_GUESSES) for _ in range(depth)]
+  return current_guesses, [get_feedback(guess, solution) for guess in current_guesses]
+
+
+def benchmark_feedback(rng, min_time) -> dict:
+  pairs = [(rng.choice(VALID_GUESSES), rng.choice(VALID_SOLUTIONS)) for _ in range(1000)]
+  guesses = [rng.choice(VALID_GUESSES) for _ in range(100)]
+  results = {}
+
+  for name, feedback_function in [("reference", Wordle.generate_feedback), ("lookup", get_feedback)]:
+    rate = calls_per_second(lambda: [feedback_function(guess, solution) for guess, solution in pairs], min_time)
+    results[f"feedback.{name}_pairs_per_sec"] = rate * len(pairs)
+
+  # batch_feedback compares every guess with every solution at once
+  rate = calls_per_second(lambda: batch_feedback(guesses, VALID_SOLUTIONS), min_time)
+  results["feedback.batch_pairs_per_sec"] = rate * len(guesses) * len(VALID_SOLUTIONS)
+  return results
+
+
+def benchmark_filter(rng, min_time) -> dict:
+  results = {}
+  for depth in FILTER_DEPTHS:
+    histories = [random_history(rng, depth) for _ in range(50)]
+    rate = calls_per_second(lambda: [filter_on_feedback(*history) for history in histories], min_time)
+    results[f"filter.depth_{depth}_calls_per_sec"] = rate * len(histories)
+  return results
+
+
+# plays num_games games with every mode the way /simulate/ does and times every call to the mode's function after the first guess,
+# which comes from the opening book or the mode's answer to an empty history. Returns the mean and 95th percentile time of a turn in milliseconds
+def benchmark_solvers(seed, num_games) -> dict:
+  results = {}
+  for mode, solver in SOLVER_MODES.items():
+    rng = random.Random(seed)
+    random.seed(seed)
+    turn_times = []
+    for _ in range(num_games):
+      solution = rng.choice(VALID_SOLUTIONS)
+      current_guesses = [get_book_guess(mode, [], []) or solver([], [], VALID_SOLUTIONS)]
+      guess_feedback = [get_feedback(current_guesses[0], solution)]
+      while guess_feedback[-1] != "CCCCC" and len(current_guesses) < 6:
+        start = time.perf_counter()
+        guess = solver(current_guesses, guess_feedback, VALID_SOLUTIONS)
+        turn_times.append(time.perf_counter() - start)
+        current_guesses.append(guess)
+        guess_feedback.append(get_feedback(guess, solution))
+    turn_times = np.array(turn_times) * 1000
+    results[f"solver.{mode}.turn_ms_mean"] = float(turn_times.mean())
+    results[f"solver.{mode}.turn_ms_p95"] = float(np.percentile(turn_times, 95))
+  return results
+
+
+# plays the same num_games solutions with every evaluation mode in one process, with the mode's own opening book like the Flask app
+# modes that aren't in the book (decision_tree) play their own first two guesses
+def benchmark_evaluation(seed, num_games) -> dict:
+  solution_indices = random.Random(seed).sample(range(len(VALID_SOLUTIONS)), num_games)
+  results = {}
+  for mode, input_function in EVALUATION_MODES.items():
+    opening_book = mode if mode in BOOK_MODES else None
+    wordle = Wordle(input_function, verbose=False, stats=False, seed=seed, opening_book=opening_book)
+    start = time.perf_counter()
+    wordle.evaluate_solutions(solution_indices)
+    results[f"evaluation.{mode}_games_per_sec"] = num_games / (time.perf_counter() - start)
+  return results
+
+
+# metrics ending in _per_sec are better when higher, every other metric is a time and better when lower
+def higher_is_better(metric) -> bool:
+  return metric.endswith("_per_sec")
+
+
+# returns the metrics that are more than tolerance (a fraction) worse than in the baseline, as (metric, baseline, result, change)
+def find_regressions(results: dict, baseline: dict, tolerance: float) -> list[tuple[str, float, float, float]]:
+  regressions = []
+  for metric, baseline_value in baseline["metrics"].items():
+    if metric not in results["metrics"]:
+      continue
+    value = results["metrics"][metric]
+    # positive change is worse, e.g. 0.3 is 30% slower
+    if higher_is_better(metric):
+      change = (baseline_value - value) / baseline_value
+    elif value - baseline_value < MIN_TIME_CHANGE_MS:
+      continue
+    else:
+      change = (value - baseline_value) / baseline_value
+    if change > tolerance:
+      regressions.append((metric, baseline_value, value, change))
+  return regressions
+
+
+# returns the metrics in results that the baseline doesn't have, e.g. the metrics of a mode added since the baseline was saved
+# they can't be compared, so they fail the comparison until a new baseline is saved
+def find_missing(results: dict, baseline: dict) -> list[str]:
+  return sorted(metric for metric in results["metrics"] if metric not in baseline["metrics"])
+
+
+def run_benchmarks(seed=0, min_time=0.5, num_games=50) -> dict:
+  # loading the feedback matrix and building the decision tree aren't part of any benchmark
+  get_feedback_matrix()
+  decision_tree.use_decision_tree(decision_tree.build_decision_tree("entropy"))
+  rng = random.Random(seed)
+
+  metrics = {}
+  metrics.update(benchmark_feedback(rng, min_time))
+  metrics.update(benchmark_filter(rng, min_time))
+  metrics.update(benchmark_solvers(seed, num_games))
+  metrics.update(benchmark_evaluation(seed, num_games))
+  return {
+    "seed": seed,
+    "num_games": num_games,
+    "machine": {"python": platform.python_version(), "numpy": np.__version__, "platform": platform.platform()},
+    "metrics": metrics,
+  }
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Benchmarks for the feedback, filter and solver hot paths")
+  parser.add_argument("--seed", type=int, default=0)
+  parser.add_argument("--min-time", type=float, default=0.5, help="seconds every throughput benchmark runs for")
+  parser.add_argument("--games", type=int, default=50, help="games played by the solver and evaluation benchmarks")
+  parser.add_argument("--output", type=pathlib.Path, default=RESULTS_PATH)
+  parser.add_argument("--baseline", type=pathlib.Path, default=None, help="baseline results to compare against")
+  parser.add_argument("--tolerance", type=float, default=0.25, help="how much worse than the baseline a metric can be, 0.25 is 25%%")
+  parser.add_argument("--save-baseline", action="store_true", help=f"write the results to {BASELINE_PATH.name}")
+  args = parser.parse_args()
+
+  results = run_benchmarks(args.seed, args.min_time, args.games)
+  output = BASELINE_PATH if args.save_baseline else args.output
+  with open(output, "w") as write_obj:
+    json.dump(results, write_obj, indent=2, sort_keys=True)
+
+  for metric, value in sorted(results["metrics"].items()):
+    print(f"{metric:45} {value:16.4f}")
+  print(f"Wrote {output}")
+
+  if args.baseline is not None:
+    with open(args.baseline, "r") as read_obj:
+      baseline = json.load(read_obj)
+    regressions = find_regressions(results, baseline, args.tolerance)
+    missing = find_missing(results, baseline)
+    for metric, baseline_value, value, change in regressions:
+      print(f"REGRESSION {metric}: {baseline_value:.2f} -> {value:.2f} ({change:.0%} worse)")
+    for metric in missing:
+      print(f"MISSING {metric}: not in {args.baseline}, save a new baseline with --save-baseline")
+    if regressions or missing:
+      sys.exit(1)
+    print(f"No metric is more than {args.tolerance:.0%} worse than {args.baseline}")
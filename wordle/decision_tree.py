@@ -0,0 +1,146 @@
+# precomputed decision tree: first guess -> feedback -> next guess -> ... for every word in valid_solutions
+# the tree is built offline by running a solver on every branch, so playing a game is a lookup instead of a search
+# to build it, run this file from the wordle folder: python decision_tree.py [solver] [first_guess]
+# e.g. python decision_tree.py entropy TARSE. This writes decision_tree.npz and prints the average and maximum depth
+
+import pathlib
+import sys
+
+import numpy as np
+
+from words import VALID_GUESSES, VALID_SOLUTIONS, GUESS_INDEX, SOLUTION_GUESS_INDEX
+from feedback_matrix import ALL_CORRECT, decode_feedback, get_feedback_matrix
+import solvers
+import tfidf
+
+TREE_PATH = pathlib.Path(__file__).parent / "decision_tree.npz"
+
+# solvers the tree can be built with. Each one maps the remaining candidates to one score per guess, higher is better
+TREE_SCORERS = {
+  "entropy": solvers.entropy_scores,
+  "minimax": solvers.minimax_scores,
+  "tfidf": tfidf.tfidf_scores,
+}
+
+# history -> next guess, loaded lazily by decision_tree_guess
+_tree_lookup = None
+
+
+# builds the decision tree by running the solver on every feedback branch until every solution is guessed
+# the tree is stored as flat arrays: node_guess[node] is the index in VALID_GUESSES to guess at that node
+# and edge_parent, edge_pattern, edge_child say which node to go to after receiving a feedback pattern at a node
+# returns the arrays along with depths, the number of guesses the tree needs for every solution
+def build_decision_tree(solver="entropy", first_guess=None) -> dict:
+  scorer = TREE_SCORERS[solver]
+  matrix = get_feedback_matrix()
+  node_guess = []
+  edges = []
+  depths = np.zeros(len(VALID_SOLUTIONS), dtype=np.int32)
+
+  # adds the node that guesses for candidates and everything below it, depth is the number of the guess made at this node
+  def add_node(candidates, depth, guess_index=None):
+    if guess_index is None:
+      if len(candidates) <= 2:
+        guess_index = SOLUTION_GUESS_INDEX[candidates[0]]
+      else:
+        # min breaks ties the same way every time, so rebuilding gives the same tree
+        guess_index = solvers.pick_best_guess(scorer(candidates), candidates, tie_break=min)
+    patterns = matrix[guess_index, candidates]
+    # a guess that can't tell any of the candidates apart would never finish, guess a candidate instead
+    if np.all(patterns == patterns[0]) and patterns[0] != ALL_CORRECT:
+      guess_index = SOLUTION_GUESS_INDEX[candidates[0]]
+      patterns = matrix[guess_index, candidates]
+
+    node = len(node_guess)
+    node_guess.append(guess_index)
+    for pattern in np.unique(patterns):
+      remaining = candidates[patterns == pattern]
+      if pattern == ALL_CORRECT:
+        depths[remaining] = depth
+      else:
+        edges.append((node, pattern, add_node(remaining, depth + 1)))
+    return node
+
+  add_node(np.arange(len(VALID_SOLUTIONS)), 1, None if first_guess is None else GUESS_INDEX[first_guess.upper()])
+
+  edges = np.array(edges, dtype=np.uint32).reshape(-1, 3)
+  return {
+    "node_guess": np.array(node_guess, dtype=np.uint16),
+    "edge_parent": edges[:, 0],
+    "edge_pattern": edges[:, 1].astype(np.uint8),
+    "edge_child": edges[:, 2],
+    "depths": depths,
+  }
+
+
+# writes the tree arrays to path, about 15KB for the full word lists
+def save_decision_tree(tree: dict, path=TREE_PATH) -> None:
+  np.savez_compressed(path, **tree)
+
+
+# reads the tree arrays from path and flattens them into a dictionary keyed on the game history, see tree_to_lookup
+def load_decision_tree(path=TREE_PATH) -> dict:
+  return tree_to_lookup(np.load(path))
+
+
+# flattens the tree arrays from build_decision_tree into a dictionary keyed on the game history
+# the key is (guess 1, feedback 1, guess 2, feedback 2, ...), the empty tuple is the first guess
+def tree_to_lookup(tree) -> dict:
+  children = {}
+  for parent, pattern, child in zip(tree["edge_parent"], tree["edge_pattern"], tree["edge_child"]):
+    children.setdefault(int(parent), []).append((decode_feedback(int(pattern)), int(child)))
+
+  lookup = {}
+  stack = [(0, ())]
+  while stack:
+    node, history = stack.pop()
+    guess = VALID_GUESSES[tree["node_guess"][node]]
+    lookup[history] = guess
+    for feedback, child in children.get(node, []):
+      stack.append((child, history + (guess, feedback)))
+  return lookup
+
+
+# makes decision_tree_guess answer from tree (the arrays from build_decision_tree) instead of the tree saved in TREE_PATH
+# e.g. benchmark.py builds the tree it measures, so the results don't depend on which tree was saved
+def use_decision_tree(tree: dict) -> None:
+  global _tree_lookup
+  _tree_lookup = tree_to_lookup(tree)
+
+
+# returns the guess the tree makes after current_guesses, or None if the tree hasn't been built or the game left the tree
+def tree_lookup(current_guesses, guess_feedback):
+  global _tree_lookup
+  if _tree_lookup is None:
+    _tree_lookup = load_decision_tree() if TREE_PATH.exists() else {}
+
+  history = tuple(word for turn in zip(current_guesses, guess_feedback) for word in turn)
+  return _tree_lookup.get(history)
+
+
+# answers every turn with one dictionary lookup on the history, input_function for Wordle
+# falls back to the entropy solver if the tree hasn't been built or the game left the tree, e.g. because of different initial guesses,
+# and in hard mode when the rules don't allow the tree's guess
+def decision_tree_guess(current_guesses, guess_feedback, filtered_guesses, valid_solutions, game_state=None) -> str:
+  guess = tree_lookup(current_guesses, guess_feedback)
+  if guess is None or (game_state is not None and not game_state.allows(guess)):
+    return solvers.entropy(current_guesses, guess_feedback, filtered_guesses, valid_solutions, game_state)
+  return guess
+
+
+# every guess decision_tree_guess could pick this turn, see solvers.entropy_choices
+def decision_tree_choices(current_guesses, guess_feedback, game_state=None) -> list[str]:
+  guess = tree_lookup(current_guesses, guess_feedback)
+  if guess is None or (game_state is not None and not game_state.allows(guess)):
+    return solvers.entropy_choices(current_guesses, guess_feedback, game_state)
+  return [guess]
+
+
+if __name__ == "__main__":
+  solver = sys.argv[1] if len(sys.argv) > 1 else "entropy"
+  first_guess = sys.argv[2] if len(sys.argv) > 2 else None
+  tree = build_decision_tree(solver, first_guess)
+  save_decision_tree(tree)
+  print(f"Built the {solver} decision tree with {len(tree['node_guess'])} nodes, first guess {VALID_GUESSES[tree['node_guess'][0]]}")
+  print(f"Average depth: {tree['depths'].mean()}")
+  print(f"Maximum depth: {tree['depths'].max()}")
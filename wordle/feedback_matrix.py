@@ -0,0 +1,176 @@
+# precomputed guess x solution feedback matrix
+# every feedback string is encoded as a base 3 integer with W = 0, M = 1, C = 2 and the first letter as the most significant digit
+# e.g. WWWWW is 0, WWWWM is 1 and CCCCC is 242, so a pattern always fits in a uint8
+# the full matrix for valid_guesses x valid_solutions is about 34MB. It is built once, saved next to the word lists
+# and memory-mapped on every later run, so looking up feedback is a single array index instead of a call to generate_feedback
+
+import os
+import pathlib
+
+import numpy as np
+
+from words import (GUESSES_PATH, SOLUTIONS_PATH, WORD_LENGTH, VALID_GUESSES, VALID_SOLUTIONS, GUESS_INDEX, SOLUTION_INDEX,
+                   GUESS_ARRAY, SOLUTION_ARRAY, words_to_array)
+
+# cached matrix, rebuilt whenever one of the word lists is newer than it
+MATRIX_PATH = pathlib.Path(__file__).parent / "feedback_matrix.npy"
+
+NUM_PATTERNS = 3 ** WORD_LENGTH
+ALL_CORRECT = NUM_PATTERNS - 1
+
+FEEDBACK_DIGITS = {"W": 0, "M": 1, "C": 2}
+DIGIT_FEEDBACK = "WMC"
+
+# place values of each letter position, first letter is the most significant digit
+PATTERN_POWERS = 3 ** np.arange(WORD_LENGTH - 1, -1, -1, dtype=np.uint8)
+
+# number of guesses compared against all solutions at once while building the matrix, keeps peak memory around 100MB
+CHUNK_SIZE = 2048
+
+# loaded lazily by get_feedback_matrix so importing this module stays cheap
+_feedback_matrix = None
+
+
+# converts a pattern code back to its feedback string, use PATTERN_STRINGS[code] on hot paths
+def decode_feedback(code: int) -> str:
+  feedback = []
+  for _ in range(WORD_LENGTH):
+    feedback.append(DIGIT_FEEDBACK[code % 3])
+    code //= 3
+  return "".join(reversed(feedback))
+
+
+# the feedback string of every pattern code and the other way around, so converting between them is a single lookup
+PATTERN_STRINGS = tuple(decode_feedback(code) for code in range(NUM_PATTERNS))
+PATTERN_CODES = {feedback: code for code, feedback in enumerate(PATTERN_STRINGS)}
+
+
+# converts a feedback string such as "CMWWC" to its pattern code
+def encode_feedback(feedback: str) -> int:
+  return PATTERN_CODES[feedback]
+
+
+# turns a word, a list of words or an array from words_to_array into an (N, WORD_LENGTH) letter index array
+def _as_letter_array(words) -> np.ndarray:
+  if isinstance(words, str):
+    return words_to_array([words])
+  if isinstance(words, np.ndarray):
+    return words.reshape(-1, WORD_LENGTH)
+  return words_to_array(words)
+
+
+# compares every guess with every solution and returns a (num_guesses, num_solutions) array of pattern codes
+# follows the same two passes as generate_feedback: correct letters first, then misplaced letters from left to right
+# e.g. solution is GROWS, guess is GOOSE: the middle O is correct, so the first O is wrong since there is no O left over
+def _feedback_codes(guess_array: np.ndarray, solution_array: np.ndarray) -> np.ndarray:
+  # number of times each letter appears in each solution, transposed so indexing with a guess column gives (num_guesses, num_solutions)
+  flat_letters = (np.arange(len(solution_array))[:, None] * 26 + solution_array).ravel()
+  solution_counts = np.bincount(flat_letters, minlength=len(solution_array) * 26).astype(np.int8)
+  solution_counts = solution_counts.reshape(-1, 26).T
+
+  correct = [guess_array[:, i, None] == solution_array[None, :, i] for i in range(WORD_LENGTH)]
+
+  codes = np.zeros((len(guess_array), len(solution_array)), dtype=np.uint8)
+  for i in range(WORD_LENGTH):
+    letter = guess_array[:, i]
+    # copies of this letter in the solution that are not used up by correct letters
+    available = solution_counts[letter].copy()
+    for j in range(WORD_LENGTH):
+      available -= correct[j] & (guess_array[:, j, None] == letter[:, None])
+    # earlier copies of this letter in the guess that are not correct get the misplaced letters first
+    for j in range(i):
+      available -= ~correct[j] & (guess_array[:, j, None] == letter[:, None])
+    misplaced = ~correct[i] & (available > 0)
+    codes += PATTERN_POWERS[i] * (2 * correct[i].astype(np.uint8) + misplaced)
+  return codes
+
+
+# vectorized generate_feedback: compares one guess (or a list of guesses) with every word in solutions in one call
+# guesses and solutions can be words or letter index arrays from words_to_array, e.g. GUESS_ARRAY[[1, 5, 9]]
+# returns the pattern codes as a (num_solutions,) array for a single guess, otherwise as a (num_guesses, num_solutions) array
+def batch_feedback(guesses, solutions) -> np.ndarray:
+  single_guess = isinstance(guesses, str) or (isinstance(guesses, np.ndarray) and guesses.ndim == 1)
+  guess_array = _as_letter_array(guesses)
+  solution_array = _as_letter_array(solutions)
+
+  # CHUNK_SIZE guesses at a time so the full matrix can be built without running out of memory
+  codes = np.empty((len(guess_array), len(solution_array)), dtype=np.uint8)
+  for start in range(0, len(guess_array), CHUNK_SIZE):
+    codes[start:start + CHUNK_SIZE] = _feedback_codes(guess_array[start:start + CHUNK_SIZE], solution_array)
+  return codes[0] if single_guess else codes
+
+
+# builds the full feedback matrix for the given word lists
+def build_feedback_matrix(valid_guesses=GUESS_ARRAY, valid_solutions=SOLUTION_ARRAY) -> np.ndarray:
+  return batch_feedback(valid_guesses, valid_solutions)
+
+
+# the cached file is stale if either word list was modified after it was written or the word lists changed size
+def _matrix_is_stale(matrix) -> bool:
+  newest_word_list = max(GUESSES_PATH.stat().st_mtime, SOLUTIONS_PATH.stat().st_mtime)
+  return (MATRIX_PATH.stat().st_mtime < newest_word_list
+          or matrix.shape != (len(VALID_GUESSES), len(VALID_SOLUTIONS)))
+
+
+# returns the memory-mapped feedback matrix, building and saving it first if needed
+def get_feedback_matrix() -> np.ndarray:
+  global _feedback_matrix
+  if _feedback_matrix is not None:
+    return _feedback_matrix
+
+  if MATRIX_PATH.exists():
+    matrix = np.load(MATRIX_PATH, mmap_mode="r")
+    if not _matrix_is_stale(matrix):
+      _feedback_matrix = matrix
+      return _feedback_matrix
+
+  # write to a temporary file first so other processes never load a half written matrix
+  temp_path = MATRIX_PATH.with_name(f"{MATRIX_PATH.stem}.{os.getpid()}.tmp")
+  with open(temp_path, "wb") as write_obj:
+    np.save(write_obj, build_feedback_matrix())
+  os.replace(temp_path, MATRIX_PATH)
+
+  _feedback_matrix = np.load(MATRIX_PATH, mmap_mode="r")
+  return _feedback_matrix
+
+
+# returns the pattern code for a guess and solution, computing it directly if either word is not in the word lists
+# the words are nearly always already in capitals, so they are only converted when the first lookup misses
+# item() reads the code as a Python int, which is several times faster than indexing the memory-mapped matrix
+def get_feedback_code(current_guess: str, current_solution: str) -> int:
+  guess_index = GUESS_INDEX.get(current_guess)
+  solution_index = SOLUTION_INDEX.get(current_solution)
+  if guess_index is None or solution_index is None:
+    current_guess = current_guess.upper()
+    current_solution = current_solution.upper()
+    guess_index = GUESS_INDEX.get(current_guess)
+    solution_index = SOLUTION_INDEX.get(current_solution)
+    if guess_index is None or solution_index is None:
+      return int(batch_feedback(current_guess, current_solution)[0])
+  return get_feedback_matrix().item(guess_index, solution_index)
+
+
+# drop-in replacement for generate_feedback, returns the same feedback string
+def get_feedback(current_guess: str, current_solution: str) -> str:
+  return PATTERN_STRINGS[get_feedback_code(current_guess, current_solution)]
+
+
+# returns the words of valid_solutions that would have given feedback for guess
+# this is the same as comparing generate_feedback(guess, word) == feedback for every word, but reads one matrix row instead
+def matching_solutions(guess: str, feedback: str, valid_solutions=VALID_SOLUTIONS) -> list[str]:
+  guess = guess.upper()
+  code = encode_feedback(feedback)
+  guess_index = GUESS_INDEX.get(guess)
+  if guess_index is None or any(word not in SOLUTION_INDEX for word in valid_solutions):
+    codes = batch_feedback(guess, valid_solutions)
+  elif valid_solutions == VALID_SOLUTIONS:
+    return [VALID_SOLUTIONS[i] for i in np.flatnonzero(get_feedback_matrix()[guess_index] == code)]
+  else:
+    codes = get_feedback_matrix()[guess_index, [SOLUTION_INDEX[word] for word in valid_solutions]]
+  return [word for word, word_code in zip(valid_solutions, codes) if word_code == code]
+
+
+# keeps the indices in candidates (indices into VALID_SOLUTIONS) of the solutions that would have given the pattern code for guess
+def narrow_candidates(candidates: np.ndarray, guess: str, code: int) -> np.ndarray:
+  row = get_feedback_matrix()[GUESS_INDEX[guess.upper()]]
+  return candidates[row[candidates] == code]
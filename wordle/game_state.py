@@ -0,0 +1,100 @@
+# keeps track of a single game: the guesses so far, their feedback and the solutions that still match all of that feedback
+# candidates are narrowed every time a guess and its feedback come in, so every turn only looks at the solutions that are left
+# instead of replaying the whole history against every word in valid_solutions
+
+import sys
+
+import numpy as np
+
+from words import VALID_GUESSES, VALID_SOLUTIONS
+from feedback_matrix import encode_feedback, narrow_candidates
+from letter_masks import HardModeConstraints, filter_indices
+
+
+class GameState:
+  # hard_mode = True means every guess has to be a word that could still be the solution, see letter_masks.HardModeConstraints
+  def __init__(self, current_guesses=(), guess_feedback=(), hard_mode=False) -> None:
+    self.current_guesses = []
+    self.guess_feedback = []
+
+    # the hard mode rules for the history so far, only kept up to date in hard mode
+    self.hard_mode = hard_mode
+    self.constraints = HardModeConstraints()
+    # allowed_guesses for the current history, only worked out when it is used
+    self._allowed_guesses = None
+
+    # indices into VALID_SOLUTIONS of the solutions that match every guess and its feedback so far
+    # uint16 is enough for every word list and keeps the candidates of a new game under 5KB
+    self.candidates = np.arange(len(VALID_SOLUTIONS), dtype=np.uint16)
+
+    # filter_on_feedback for the current history, only worked out when filtered_guesses is used
+    self._filtered_guesses = None
+
+    # anything a solver wants to keep for the current turn, e.g. the guess it already picked, cleared by update
+    self.solver_cache = {}
+
+    for guess, feedback in zip(current_guesses, guess_feedback):
+      self.update(guess, feedback)
+
+  # adds a guess and its feedback and narrows down the candidates that are left
+  # code is the pattern code of feedback, pass it when it is already known (e.g. from get_feedback_code) so it isn't encoded again
+  def update(self, guess: str, feedback: str, code=None) -> None:
+    self.current_guesses.append(guess)
+    self.guess_feedback.append(feedback)
+    if code is None:
+      code = encode_feedback(feedback)
+    self.candidates = narrow_candidates(self.candidates, guess, code)
+    if self.hard_mode:
+      self.constraints.update(guess, feedback)
+    self._filtered_guesses = None
+    self._allowed_guesses = None
+    self.solver_cache = {}
+
+  # the words in valid_solutions that are still possible
+  @property
+  def remaining_solutions(self) -> list[str]:
+    return [VALID_SOLUTIONS[i] for i in self.candidates]
+
+  # same as filter_on_feedback in the Wordle class. Unlike the candidates, this can't be narrowed one guess at a time
+  # since later feedback can take a letter off the wrong list, so it is worked out for the whole history once per turn when asked for
+  # in hard mode these are the guesses that are allowed instead
+  @property
+  def filtered_guesses(self) -> list[str]:
+    if self._filtered_guesses is None:
+      indices = self.allowed_guesses if self.hard_mode else filter_indices(self.current_guesses, self.guess_feedback)
+      self._filtered_guesses = [VALID_GUESSES[i] for i in indices]
+    return self._filtered_guesses
+
+  # indices into VALID_GUESSES of the guesses that meet the hard mode rules for the history so far
+  @property
+  def allowed_guesses(self) -> np.ndarray:
+    if self._allowed_guesses is None:
+      self._allowed_guesses = self.constraints.allowed_indices()
+    return self._allowed_guesses
+
+  # whether guess can be played next, every valid guess can be played when it's not hard mode
+  def allows(self, guess: str) -> bool:
+    return not self.hard_mode or self.constraints.allows(guess)
+
+  # approximate number of bytes this game keeps alive. The candidates are at most 2 bytes per solution,
+  # filtered_guesses adds a pointer per guess that is still allowed and allowed_guesses an index per guess while they are cached
+  def nbytes(self) -> int:
+    size = self.candidates.nbytes + sys.getsizeof(self.current_guesses) + sys.getsizeof(self.guess_feedback)
+    size += sum(sys.getsizeof(word) for word in self.current_guesses + self.guess_feedback)
+    if self._filtered_guesses is not None:
+      size += sys.getsizeof(self._filtered_guesses)
+    if self._allowed_guesses is not None:
+      size += self._allowed_guesses.nbytes
+    size += self.constraints.allowed.nbytes + self.constraints.min_counts.nbytes + self.constraints.max_counts.nbytes
+    return size + sys.getsizeof(self.solver_cache)
+
+  def copy(self) -> "GameState":
+    game_state = GameState(hard_mode=self.hard_mode)
+    game_state.current_guesses = self.current_guesses.copy()
+    game_state.guess_feedback = self.guess_feedback.copy()
+    game_state.candidates = self.candidates
+    game_state.constraints = self.constraints.copy()
+    game_state._filtered_guesses = self._filtered_guesses
+    game_state._allowed_guesses = self._allowed_guesses
+    game_state.solver_cache = self.solver_cache.copy()
+    return game_state
@@ -0,0 +1,61 @@
+# per-turn timings and candidate counts recorded by Wordle(instrument=True)
+# every turn records how long it took to pick the guess (the opening book or input_function), how long filtering took
+# (filter_on_feedback for input functions that get filtered_guesses plus narrowing down the candidates after the feedback)
+# and how many solutions were still possible before and after the guess
+# summary aggregates the turns into percentiles per turn number, to_json and to_csv export everything
+
+import csv
+import json
+
+import numpy as np
+
+# columns of every recorded turn, times are in seconds
+TURN_FIELDS = ["solution", "turn", "input_time", "filter_time", "candidates_before", "candidates_after"]
+
+PERCENTILES = [50, 90, 99]
+
+
+class TurnRecorder:
+  def __init__(self) -> None:
+    # one tuple with the TURN_FIELDS per turn
+    self.turns = []
+
+  def record(self, solution: str, turn: int, input_time: float, filter_time: float, candidates_before: int, candidates_after: int) -> None:
+    self.turns.append((solution, turn, input_time, filter_time, candidates_before, candidates_after))
+
+  # {turn number: {"count", "input_time", "filter_time", "candidates_before", "candidates_after"}}, turn numbers start at 1
+  # times have a mean and the PERCENTILES in milliseconds, candidate counts have a mean and the same percentiles
+  def summary(self) -> dict:
+    if not self.turns:
+      return {}
+    columns = np.array([turn[1:] for turn in self.turns], dtype=float)
+    summary = {}
+    for turn in np.unique(columns[:, 0]).astype(int):
+      rows = columns[columns[:, 0] == turn]
+      turn_summary = {"count": len(rows)}
+      for i, field in enumerate(TURN_FIELDS[2:], start=1):
+        values = rows[:, i] * 1000 if field.endswith("_time") else rows[:, i]
+        turn_summary[field] = {"mean": float(values.mean())}
+        turn_summary[field].update({f"p{p}": float(value) for p, value in zip(PERCENTILES, np.percentile(values, PERCENTILES))})
+      summary[int(turn)] = turn_summary
+    return summary
+
+  # writes the summary and every recorded turn
+  def to_json(self, path) -> None:
+    with open(path, "w") as write_obj:
+      json.dump({"summary": self.summary(), "turns": [dict(zip(TURN_FIELDS, turn)) for turn in self.turns]}, write_obj, indent=2)
+
+  # writes every recorded turn, one row each
+  def to_csv(self, path) -> None:
+    with open(path, "w", newline="") as write_obj:
+      writer = csv.writer(write_obj)
+      writer.writerow(TURN_FIELDS)
+      writer.writerows(self.turns)
+
+  def print_summary(self) -> None:
+    print("Turn  Count  Input p50/p90/p99 (ms)      Filter p50/p90/p99 (ms)     Candidates before -> after (mean)")
+    for turn, turn_summary in self.summary().items():
+      input_time = "/".join(f"{turn_summary['input_time'][f'p{p}']:.2f}" for p in PERCENTILES)
+      filter_time = "/".join(f"{turn_summary['filter_time'][f'p{p}']:.2f}" for p in PERCENTILES)
+      candidates = f"{turn_summary['candidates_before']['mean']:.1f} -> {turn_summary['candidates_after']['mean']:.1f}"
+      print(f"{turn:<6}{turn_summary['count']:<7}{input_time:<28}{filter_time:<28}{candidates}")
@@ -0,0 +1,138 @@
+# per-position letter bitmasks used to filter valid_guesses on feedback
+# every letter is a single bit, A = 1 << 0 ... Z = 1 << 25, so each position of a word is one 26 bit mask
+# filter_on_feedback builds one mask of banned letters per position and keeps the words where no position hits its mask,
+# which is a handful of array operations over all 14,855 words instead of a Python loop over every letter of every word
+# HardModeConstraints uses the same masks, plus the letter counts of every word, for the rules of hard mode
+
+import numpy as np
+
+from words import WORD_LENGTH, VALID_GUESSES, GUESS_ARRAY
+
+# (num_words, WORD_LENGTH) array, POSITION_MASKS[w, i] is the bit of the i-th letter of VALID_GUESSES[w]
+POSITION_MASKS = np.left_shift(np.uint32(1), GUESS_ARRAY.astype(np.uint32))
+
+# (num_words, 26) array, LETTER_COUNTS[w, l] is how often the l-th letter of the alphabet is in VALID_GUESSES[w]
+LETTER_COUNTS = (GUESS_ARRAY[:, :, None] == np.arange(26)).sum(axis=1).astype(np.uint8)
+
+# mask with every letter allowed
+ALL_LETTERS = np.uint32((1 << 26) - 1)
+
+
+# converts a list of words into the same kind of array as POSITION_MASKS
+def words_to_masks(words) -> np.ndarray:
+  if not words:
+    return np.zeros((0, WORD_LENGTH), dtype=np.uint32)
+  letters = np.array([[ord(letter) - ord("A") for letter in word.upper()] for word in words], dtype=np.uint32)
+  return np.left_shift(np.uint32(1), letters)
+
+
+# builds one mask per position holding all letters that shouldn't be in that position
+# this means either letters that are wrong (these letters are banned from all letter positions)
+# or letters that are misplaced for this position
+# green tiles are disregarded on purpose, see filter_on_feedback for why
+def banned_letter_masks(current_guesses, guess_feedback) -> np.ndarray:
+  banned = np.zeros(WORD_LENGTH, dtype=np.uint32)
+  # helps in cases where a word has multiple of the same letter
+  not_wrong_letters = 0
+
+  # need separate for loops because words with multiple of the same letter would have that letter be propogated to all positions
+  for guess, feedback in zip(current_guesses, guess_feedback):
+    for i in range(WORD_LENGTH):
+      bit = 1 << (ord(guess[i]) - ord("A"))
+      if feedback[i] == "M":
+        banned[i] |= bit
+        not_wrong_letters |= bit
+      elif feedback[i] == "C":
+        not_wrong_letters |= bit
+  for guess, feedback in zip(current_guesses, guess_feedback):
+    for i in range(WORD_LENGTH):
+      bit = 1 << (ord(guess[i]) - ord("A"))
+      if feedback[i] == "W":
+        if not_wrong_letters & bit:
+          banned[i] |= bit
+        else:
+          # propagate to all positions, since letter cannot be in word at all
+          banned |= bit
+  return banned
+
+
+# returns the indices (into the words behind masks) of all words that don't have a banned letter in any position
+def filter_indices(current_guesses, guess_feedback, masks=POSITION_MASKS) -> np.ndarray:
+  banned = banned_letter_masks(current_guesses, guess_feedback)
+  return np.flatnonzero(~((masks & banned).any(axis=1)))
+
+
+# takes in the current guesses and guess feedback and returns a filtered list of valid_guesses
+# disregard green tiles, handle that separately. If green tiles are used to filter the list of valid_guesses,
+# guesses may not be great. E.g. GREEN returns CCCMW, if you limit the guessing space to words starting with GRE,
+# it's hard to eliminate other letters as there are only 2 more spots left
+# We will let individual algorithms handle what to do with the green tiles
+def filter_on_feedback(current_guesses, guess_feedback, valid_guesses=VALID_GUESSES) -> list[str]:
+  if valid_guesses is VALID_GUESSES or valid_guesses == VALID_GUESSES:
+    return [VALID_GUESSES[i] for i in filter_indices(current_guesses, guess_feedback)]
+  return [valid_guesses[i] for i in filter_indices(current_guesses, guess_feedback, words_to_masks(valid_guesses))]
+
+
+# the rules of hard mode: every guess has to be a word that could still be the solution after all the feedback so far
+# every guess and its feedback are compiled into the letters allowed in each position (a green letter is the only one allowed
+# in its position, a yellow or gray letter isn't allowed in its position) and the least and most times every letter can be in the word
+# (a letter is in the word at least as often as it was green or yellow in one guess, and exactly that often if it was also gray)
+# the constraints of every guess are merged into one set of the same size, so update and checking words cost the same however long the history is
+class HardModeConstraints:
+  def __init__(self, current_guesses=(), guess_feedback=()) -> None:
+    # bitmask of the letters allowed in every position, the same kind of mask as POSITION_MASKS
+    self.allowed = np.full(WORD_LENGTH, ALL_LETTERS, dtype=np.uint32)
+    # the l-th letter of the alphabet has to be in a word between min_counts[l] and max_counts[l] times
+    self.min_counts = np.zeros(26, dtype=np.uint8)
+    self.max_counts = np.full(26, WORD_LENGTH, dtype=np.uint8)
+
+    for guess, feedback in zip(current_guesses, guess_feedback):
+      self.update(guess, feedback)
+
+  # adds the constraints of a guess and its feedback
+  def update(self, guess: str, feedback: str) -> None:
+    # times every letter was green or yellow in this guess, and the letters that were gray
+    counts = np.zeros(26, dtype=np.uint8)
+    gray = np.zeros(26, dtype=bool)
+    for i, (letter, tile) in enumerate(zip(guess.upper(), feedback.upper())):
+      letter = ord(letter) - ord("A")
+      if tile == "C":
+        self.allowed[i] &= np.uint32(1 << letter)
+      else:
+        self.allowed[i] &= ALL_LETTERS ^ np.uint32(1 << letter)
+      if tile == "W":
+        gray[letter] = True
+      else:
+        counts[letter] += 1
+    np.maximum(self.min_counts, counts, out=self.min_counts)
+    self.max_counts[gray] = np.minimum(self.max_counts[gray], counts[gray])
+
+  # the rows of the words behind masks and letter_counts (VALID_GUESSES by default) that meet every constraint
+  def allowed_indices(self, masks=POSITION_MASKS, letter_counts=LETTER_COUNTS) -> np.ndarray:
+    allowed = (masks & self.allowed).all(axis=1)
+    # only the letters with a constraint on their count are checked
+    letters = np.flatnonzero((self.min_counts > 0) | (self.max_counts < WORD_LENGTH))
+    if len(letters) > 0:
+      counts = letter_counts[:, letters]
+      allowed &= ((counts >= self.min_counts[letters]) & (counts <= self.max_counts[letters])).all(axis=1)
+    return np.flatnonzero(allowed)
+
+  # whether word meets every constraint, i.e. whether it can be guessed in hard mode
+  def allows(self, word: str) -> bool:
+    return len(self.allowed_indices(words_to_masks([word]), words_to_counts([word]))) == 1
+
+  def copy(self) -> "HardModeConstraints":
+    constraints = HardModeConstraints()
+    constraints.allowed = self.allowed.copy()
+    constraints.min_counts = self.min_counts.copy()
+    constraints.max_counts = self.max_counts.copy()
+    return constraints
+
+
+# converts a list of words into the same kind of array as LETTER_COUNTS
+def words_to_counts(words) -> np.ndarray:
+  counts = np.zeros((len(words), 26), dtype=np.uint8)
+  for row, word in enumerate(words):
+    for letter in word.upper():
+      counts[row, ord(letter) - ord("A")] += 1
+  return counts
@@ -0,0 +1,264 @@
+# opener search: ranks every guess as a first guess, then searches for the best sets of 2 and 3 guesses to open with
+# a set of openers is played whatever the feedback (like Wordle(initial_guesses=...)), so it is scored by how its joint feedback
+# splits the solutions: by the entropy of the joint feedback, or by the expected number of solutions left after it
+# pairs and triples are found with a beam search: only the beam_width best sets of one size are extended with every guess,
+# and a guess is only scored with a set if an upper bound on their joint score can beat the best sets found so far
+# the beams are spread over all cores and every finished beam is written to a checkpoint, so an interrupted search resumes where it stopped
+# to build the table, run this file from the wordle folder: python openers.py [--metric entropy|expected] [--workers N]
+# this writes openers.json, e.g. Wordle(initial_guesses=best_openers(2)) opens with the best pair
+
+import argparse
+import json
+import os
+import pathlib
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from words import VALID_GUESSES, VALID_SOLUTIONS, GUESS_INDEX
+from feedback_matrix import NUM_PATTERNS, get_feedback_matrix
+import solvers
+
+OPENERS_PATH = pathlib.Path(__file__).parent / "openers.json"
+CHECKPOINT_PATH = pathlib.Path(__file__).parent / "openers_checkpoint.json"
+
+# entropy is in bits, expected is the expected number of solutions left. Both are stored so that higher is better
+METRICS = ["entropy", "expected"]
+
+# number of guesses scored with a set at once
+CHUNK_SIZE = 1024
+
+# (num_guesses, NUM_PATTERNS) feedback pattern histograms of every single guess, worked out once per process by single_histograms
+_single_histograms = None
+
+
+def single_histograms() -> np.ndarray:
+  global _single_histograms
+  if _single_histograms is None:
+    candidates = np.arange(len(VALID_SOLUTIONS))
+    _single_histograms = np.concatenate([
+      solvers.pattern_histograms(candidates, slice(start, start + solvers.SCORE_CHUNK_SIZE))
+      for start in range(0, len(VALID_GUESSES), solvers.SCORE_CHUNK_SIZE)
+    ])
+  return _single_histograms
+
+
+# the cost of buckets of the given sizes, a partition's cost is the sum over its buckets and lower is better
+# s * log2(s) for entropy and s ** 2 for expected, both are convex
+def bucket_cost(sizes, metric) -> np.ndarray:
+  sizes = np.asarray(sizes, dtype=np.float64)
+  if metric == "entropy":
+    with np.errstate(divide="ignore", invalid="ignore"):
+      return np.nan_to_num(sizes * np.log2(sizes))
+  return sizes ** 2
+
+
+# turns the cost of a partition of the solutions into its score, higher is better
+def cost_to_score(cost, metric):
+  num_solutions = len(VALID_SOLUTIONS)
+  if metric == "entropy":
+    return np.log2(num_solutions) - cost / num_solutions
+  return -cost / num_solutions
+
+
+# lower bound on the cost after every bucket of the given sizes is split into at most max_parts parts
+# the cost is convex, so a bucket costs the least when it is split as evenly as possible
+def split_cost_bound(sizes, max_parts, metric) -> np.ndarray:
+  sizes = np.asarray(sizes, dtype=np.float64)
+  parts = np.minimum(sizes, max_parts)
+  with np.errstate(divide="ignore", invalid="ignore"):
+    return np.nan_to_num(parts * bucket_cost(sizes / parts, metric))
+
+
+# the bucket of every solution under the joint feedback of opener_set, numbered from 0, and the size of every bucket
+def joint_buckets(opener_set) -> tuple[np.ndarray, np.ndarray]:
+  matrix = get_feedback_matrix()
+  combined = np.zeros(len(VALID_SOLUTIONS), dtype=np.int64)
+  for guess_index in opener_set:
+    combined = combined * NUM_PATTERNS + matrix[guess_index]
+  _, buckets, sizes = np.unique(combined, return_inverse=True, return_counts=True)
+  return buckets.ravel(), sizes
+
+
+# the cost of the joint feedback of a set (given by its buckets) with each of guesses
+# every row of joint buckets is sorted, so the runs of equal values are the buckets of that guess
+def joint_costs(buckets, guesses, metric) -> np.ndarray:
+  num_solutions = len(VALID_SOLUTIONS)
+  joint = buckets.astype(np.int64)[None, :] * NUM_PATTERNS + get_feedback_matrix()[guesses]
+  joint.sort(axis=1)
+  flat = joint.ravel()
+  run_starts = np.ones(len(flat), dtype=bool)
+  run_starts[1:] = flat[1:] != flat[:-1]
+  run_starts[::num_solutions] = True
+  starts = np.flatnonzero(run_starts)
+  lengths = np.diff(np.append(starts, len(flat)))
+  return np.bincount(starts // num_solutions, weights=bucket_cost(lengths, metric), minlength=len(guesses))
+
+
+# scores opener_set with every guess that isn't in it, skipping the guesses whose upper bound can't beat threshold
+# returns at most keep of the best (set, score) pairs it found above threshold, with every set sorted, and how many guesses it scored
+def extend_set(opener_set, metric, threshold, keep) -> tuple[list, int]:
+  num_solutions = len(VALID_SOLUTIONS)
+  histograms = single_histograms()
+  buckets, sizes = joint_buckets(opener_set)
+  guesses = np.setdiff1d(np.arange(len(VALID_GUESSES)), opener_set)
+
+  # the joint buckets split every bucket of the set into at most NUM_PATTERNS parts and every bucket of the guess
+  # into at most len(sizes) parts, and the joint entropy is at most the entropy of the set plus the entropy of the guess
+  set_bound = split_cost_bound(sizes, NUM_PATTERNS, metric).sum()
+  cost_bound = np.maximum(set_bound, split_cost_bound(histograms[guesses], len(sizes), metric).sum(axis=1))
+  if metric == "entropy":
+    single_costs = bucket_cost(histograms[guesses], metric).sum(axis=1)
+    cost_bound = np.maximum(cost_bound, bucket_cost(sizes, metric).sum() + single_costs - num_solutions * np.log2(num_solutions))
+  # a little slack so rounding never prunes a guess whose bound is tight
+  upper = cost_to_score(cost_bound, metric) + 1e-9
+
+  order = np.argsort(-upper, kind="stable")
+  guesses, upper = guesses[order], upper[order]
+  found_guesses = np.zeros(0, dtype=np.int64)
+  found_scores = np.zeros(0)
+  scored = 0
+  for start in range(0, len(guesses), CHUNK_SIZE):
+    if upper[start] <= threshold:
+      break
+    chunk = guesses[start:start + CHUNK_SIZE][upper[start:start + CHUNK_SIZE] > threshold]
+    scores = cost_to_score(joint_costs(buckets, chunk, metric), metric)
+    scored += len(chunk)
+    better = scores > threshold
+    found_guesses = np.concatenate([found_guesses, chunk[better]])
+    found_scores = np.concatenate([found_scores, scores[better]])
+    if len(found_scores) >= keep:
+      best = np.argsort(-found_scores, kind="stable")[:keep]
+      found_guesses, found_scores = found_guesses[best], found_scores[best]
+      threshold = max(threshold, found_scores[-1])
+
+  found = [(tuple(sorted(tuple(opener_set) + (int(guess_index),))), float(score)) for guess_index, score in zip(found_guesses, found_scores)]
+  return found, scored
+
+
+# the score the results need to beat to get into the best keep sets
+def keep_threshold(results: dict, keep: int) -> float:
+  if len(results) < keep:
+    return -np.inf
+  return sorted(results.values(), reverse=True)[keep - 1]
+
+
+# results as [(set, score)], best first, ties broken by the set so the order is the same every run
+def ranked(results: dict) -> list:
+  return sorted(results.items(), key=lambda item: (-item[1], item[0]))
+
+
+def load_checkpoint(path, params) -> dict:
+  if path.exists():
+    with open(path, "r") as read_obj:
+      checkpoint = json.load(read_obj)
+    if checkpoint["params"] == params:
+      return checkpoint
+    print(f"{path.name} was written with different settings, starting over")
+  return {"params": params, "levels": {}}
+
+
+# written to a temporary file first, so an interrupted write never leaves a broken checkpoint
+def save_checkpoint(checkpoint: dict, path) -> None:
+  temporary_path = path.with_suffix(".tmp")
+  with open(temporary_path, "w") as write_obj:
+    json.dump(checkpoint, write_obj)
+  os.replace(temporary_path, path)
+
+
+# ranks every single guess, then runs the beam search for every set size up to max_size
+# returns {size: [(set, score)]} with the best max(top, beam_width) sets of every size, best first
+def search_openers(metric="entropy", max_size=3, beam_width=50, top=100, workers=None, checkpoint_path=CHECKPOINT_PATH) -> dict:
+  workers = workers or os.cpu_count() or 1
+  keep = max(top, beam_width)
+  params = {"metric": metric, "max_size": max_size, "beam_width": beam_width, "top": top}
+  checkpoint = load_checkpoint(checkpoint_path, params)
+
+  single_costs = bucket_cost(single_histograms(), metric).sum(axis=1)
+  levels = {1: ranked({(guess_index,): float(score) for guess_index, score in enumerate(cost_to_score(single_costs, metric))})[:keep]}
+
+  with ProcessPoolExecutor(max_workers=workers, initializer=get_feedback_matrix) as executor:
+    for size in range(2, max_size + 1):
+      state = checkpoint["levels"].setdefault(str(size), {"done": [], "results": []})
+      results = {tuple(opener_set): score for opener_set, score in state["results"]}
+      done = {tuple(opener_set) for opener_set in state["done"]}
+      beams = [opener_set for opener_set, _ in levels[size - 1][:beam_width] if opener_set not in done]
+      if done:
+        print(f"Resuming size {size}: {len(done)} of {len(done) + len(beams)} beams are done")
+
+      # at most one beam per worker is in flight, so every beam starts with the best threshold known at that point
+      pending = {}
+      while beams or pending:
+        while beams and len(pending) < workers:
+          opener_set = beams.pop(0)
+          pending[executor.submit(extend_set, opener_set, metric, keep_threshold(results, keep), keep)] = opener_set
+        finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in finished:
+          opener_set = pending.pop(future)
+          found, scored = future.result()
+          for extended_set, score in found:
+            results[extended_set] = score
+          results = dict(ranked(results)[:keep])
+          done.add(opener_set)
+          state["done"] = [list(beam) for beam in sorted(done)]
+          state["results"] = [[list(extended_set), score] for extended_set, score in results.items()]
+          save_checkpoint(checkpoint, checkpoint_path)
+          print(f"Size {size}: extended {' '.join(VALID_GUESSES[i] for i in opener_set)} ({len(done)} done), "
+                f"scored {scored} of {len(VALID_GUESSES) - size + 1} guesses")
+      levels[size] = ranked(results)
+  return levels
+
+
+# the entropy and expected number of solutions left of a set of openers given as words
+def opener_stats(words) -> dict:
+  _, sizes = joint_buckets([GUESS_INDEX[word] for word in words])
+  return {
+    "entropy": float(cost_to_score(bucket_cost(sizes, "entropy").sum(), "entropy")),
+    "expected_remaining": float(-cost_to_score(bucket_cost(sizes, "expected").sum(), "expected")),
+  }
+
+
+# the table written to openers.json: {"metric", "beam_width", "openers": {size: [{"words", "entropy", "expected_remaining"}]}}
+# with the best top sets of every size, best first
+def build_table(levels: dict, metric: str, beam_width: int, top: int) -> dict:
+  openers = {}
+  for size, results in levels.items():
+    openers[str(size)] = []
+    for opener_set, _ in results[:top]:
+      words = [VALID_GUESSES[i] for i in opener_set]
+      openers[str(size)].append({"words": words, **opener_stats(words)})
+  return {"metric": metric, "beam_width": beam_width, "openers": openers}
+
+
+def load_openers(path=OPENERS_PATH) -> dict:
+  with open(path, "r") as read_obj:
+    return json.load(read_obj)
+
+
+# the best set of size openers in the table, or None if the table hasn't been built or has no sets of that size
+def best_openers(size, path=OPENERS_PATH):
+  if not pathlib.Path(path).exists():
+    return None
+  openers = load_openers(path)["openers"].get(str(size))
+  return openers[0]["words"] if openers else None
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Ranks single openers and searches for the best sets of 2 and 3 openers")
+  parser.add_argument("--metric", choices=METRICS, default="entropy")
+  parser.add_argument("--max-size", type=int, default=3, help="largest set of openers to search for")
+  parser.add_argument("--beam-width", type=int, default=50, help="best sets of every size that are extended to the next size")
+  parser.add_argument("--top", type=int, default=100, help="sets of every size written to the table")
+  parser.add_argument("--workers", type=int, default=None, help="processes to search with, all cores by default")
+  parser.add_argument("--output", type=pathlib.Path, default=OPENERS_PATH)
+  parser.add_argument("--checkpoint", type=pathlib.Path, default=CHECKPOINT_PATH)
+  args = parser.parse_args()
+
+  levels = search_openers(args.metric, args.max_size, args.beam_width, args.top, args.workers, args.checkpoint)
+  table = build_table(levels, args.metric, args.beam_width, args.top)
+  with open(args.output, "w") as write_obj:
+    json.dump(table, write_obj, indent=2)
+  for size, openers in table["openers"].items():
+    best = openers[0]
+    print(f"Best {size}: {' '.join(best['words'])}, entropy {best['entropy']:.4f}, expected remaining {best['expected_remaining']:.2f}")
+  print(f"Wrote {args.output}, delete {args.checkpoint.name} to search again from scratch")
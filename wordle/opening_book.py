@@ -0,0 +1,90 @@
+# opening book: the first guess of every mode and its second guess for every feedback the first guess can get
+# the first two turns are the slowest for every solver since nearly every solution is still possible, but their answers only depend
+# on the opening and the feedback to it, so they are worked out once and stored in opening_book.json next to the word lists
+# to rebuild it, run this file from the wordle folder: python opening_book.py
+
+import json
+import pathlib
+
+import numpy as np
+
+from words import VALID_GUESSES, GUESS_INDEX, SOLUTION_GUESS_INDEX
+from feedback_matrix import ALL_CORRECT, decode_feedback, get_feedback_matrix
+import solvers
+import tfidf
+
+BOOK_PATH = pathlib.Path(__file__).parent / "opening_book.json"
+
+# mode -> (opening, scorer used to pick the second guesses)
+# the scorer maps the remaining candidates to one score per guess, higher is better
+# modes without a scorer pick their second guess randomly, so only their opening is in the book
+BOOK_MODES = {
+  "only_matched_patterns": ("CRANE", None),
+  # AEROS, AROSE and SOARE tie for the best letter frequency score
+  "letter_frequency": ("AEROS", None),
+  "entropy": ("TARSE", solvers.entropy_scores),
+  # CHING has the highest tf-idf score over all solutions, the guess the tfidf solver opens with without the book
+  "tfidf": ("CHING", tfidf.tfidf_scores),
+  # OLATE leaves at most 160 solutions, the fewest of any guess
+  "minimax": ("OLATE", solvers.minimax_scores),
+  "minimax_lookahead": ("OLATE", solvers.minimax_lookahead_scores),
+}
+
+# loaded lazily by get_book_guess
+_opening_book = None
+
+
+# works out the second guess for every feedback the opening of every mode in BOOK_MODES can get
+# returns {mode: {"opening": word, "replies": {feedback: second guess}}}
+def build_opening_book() -> dict:
+  matrix = get_feedback_matrix()
+  book = {}
+  for mode, (opening, scorer) in BOOK_MODES.items():
+    replies = {}
+    if scorer is not None:
+      row = matrix[GUESS_INDEX[opening]]
+      for pattern in np.unique(row):
+        if pattern == ALL_CORRECT:
+          continue
+        candidates = np.flatnonzero(row == pattern)
+        if len(candidates) <= 2:
+          guess_index = SOLUTION_GUESS_INDEX[candidates[0]]
+        else:
+          # min breaks ties the same way every time, so rebuilding gives the same book
+          guess_index = solvers.pick_best_guess(scorer(candidates), candidates, tie_break=min)
+        replies[decode_feedback(int(pattern))] = VALID_GUESSES[guess_index]
+    book[mode] = {"opening": opening, "replies": replies}
+  return book
+
+
+def save_opening_book(book: dict, path=BOOK_PATH) -> None:
+  with open(path, "w") as write_obj:
+    json.dump(book, write_obj, indent=2, sort_keys=True)
+
+
+def load_opening_book(path=BOOK_PATH) -> dict:
+  with open(path, "r") as read_obj:
+    return json.load(read_obj)
+
+
+# returns the book guess for mode after current_guesses, or None if the book doesn't cover this turn and the solver has to search
+def get_book_guess(mode, current_guesses, guess_feedback):
+  global _opening_book
+  if _opening_book is None:
+    _opening_book = load_opening_book() if BOOK_PATH.exists() else {}
+
+  entry = _opening_book.get(mode)
+  if entry is None:
+    return None
+  if len(current_guesses) == 0:
+    return entry["opening"]
+  if len(current_guesses) == 1 and current_guesses[0] == entry["opening"]:
+    return entry["replies"].get(guess_feedback[0])
+  return None
+
+
+if __name__ == "__main__":
+  book = build_opening_book()
+  save_opening_book(book)
+  for mode, entry in book.items():
+    print(f"{mode}: opening {entry['opening']}, {len(entry['replies'])} second guesses")
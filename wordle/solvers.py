@@ -0,0 +1,293 @@
+# solvers shared by the Wordle class and the Flask backend
+# they all work on the precomputed feedback matrix, so candidates are indices into VALID_SOLUTIONS and guesses are indices into VALID_GUESSES
+# the functions without a leading underscore and with the (current_guesses, guess_feedback, filtered_guesses, valid_solutions)
+# arguments can be passed to Wordle as input_function, ui/algorithms.py wraps them for the /generate_guess/ route
+# when they are given a GameState they use its candidates instead of working them out from the whole history
+
+import random
+
+import numpy as np
+
+from words import VALID_GUESSES, VALID_SOLUTIONS, SOLUTION_GUESS_INDEX
+from feedback_matrix import ALL_CORRECT, NUM_PATTERNS, encode_feedback, get_feedback_matrix, narrow_candidates
+from letter_masks import LETTER_COUNTS, filter_indices
+
+# number of guesses scored at once, keeps the pattern histograms around 30MB
+SCORE_CHUNK_SIZE = 2048
+
+# minimax scores guesses in blocks of this many guesses, going through the candidates in MINIMAX_CANDIDATE_STEPS steps
+# of at least MINIMAX_MIN_STEP candidates, smaller steps cost more than the guesses they drop
+MINIMAX_BLOCK_SIZE = 1024
+MINIMAX_CANDIDATE_STEPS = 8
+MINIMAX_MIN_STEP = 32
+
+# the depth 2 lookahead only looks at this many of the best guesses, and only once at most this many candidates are left
+MINIMAX_LOOKAHEAD_WIDTH = 10
+MINIMAX_LOOKAHEAD_MAX_CANDIDATES = 200
+
+# letter_frequency bonus for every position holding a letter that was green or only ever yellow, in quarter points
+# the notebook's weighing of 0.5 gives 0.5 * 1.5 for green letters and 0.5 for yellow letters
+LETTER_FREQUENCY_BONUS = {"C": 3, "M": 2}
+
+
+# returns the indices of the solutions that match every guess and its feedback so far
+def remaining_candidates(current_guesses, guess_feedback) -> np.ndarray:
+  candidates = np.arange(len(VALID_SOLUTIONS))
+  for guess, feedback in zip(current_guesses, guess_feedback):
+    candidates = narrow_candidates(candidates, guess, encode_feedback(feedback))
+  return candidates
+
+
+# counts how many of the candidates fall into each feedback pattern for every guess
+# guesses is a slice or an array of indices into VALID_GUESSES, a slice avoids copying the rows of the feedback matrix
+# returns a (num_guesses, NUM_PATTERNS) array, every guess row gets its own range of NUM_PATTERNS bins in a single bincount
+def pattern_histograms(candidates: np.ndarray, guesses) -> np.ndarray:
+  patterns = get_feedback_matrix()[guesses]
+  if len(candidates) < patterns.shape[1]:
+    patterns = np.take(patterns, candidates, axis=1)
+  offsets = np.arange(len(patterns), dtype=np.intp)[:, None] * NUM_PATTERNS
+  counts = np.bincount((patterns + offsets).ravel(), minlength=len(patterns) * NUM_PATTERNS)
+  return counts.reshape(len(patterns), NUM_PATTERNS)
+
+
+# Shannon entropy (in bits) of the feedback pattern distribution over the candidates for every guess in guess_indices
+# a higher entropy means the feedback is expected to narrow the candidates down more
+# with n candidates and c of them in a pattern, the entropy is log2(n) - sum(c * log2(c)) / n, c * log2(c) is looked up in a table
+def entropy_scores(candidates: np.ndarray, guess_indices=None) -> np.ndarray:
+  num_guesses = len(VALID_GUESSES) if guess_indices is None else len(guess_indices)
+  counts = np.arange(len(candidates) + 1)
+  with np.errstate(divide="ignore", invalid="ignore"):
+    count_log_count = np.nan_to_num(counts * np.log2(counts))
+
+  scores = np.empty(num_guesses)
+  for start in range(0, num_guesses, SCORE_CHUNK_SIZE):
+    chunk = slice(start, start + SCORE_CHUNK_SIZE)
+    histograms = pattern_histograms(candidates, chunk if guess_indices is None else guess_indices[chunk])
+    scores[chunk] = np.log2(len(candidates)) - count_log_count[histograms].sum(axis=1) / len(candidates)
+  return scores
+
+
+# returns the indices of the guesses tied for the best score, only the ones that could be the solution if there are any
+def best_guesses(scores: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+  is_candidate = np.zeros(len(VALID_GUESSES), dtype=bool)
+  is_candidate[SOLUTION_GUESS_INDEX[candidates]] = True
+  best = np.flatnonzero(np.isclose(scores, scores.max()))
+  best_candidates = best[is_candidate[best]]
+  return best_candidates if len(best_candidates) > 0 else best
+
+
+# returns the index of a guess with the best score, preferring guesses that could be the solution
+# tie_break picks one of the tied guess indices, random.choice by default, min gives the same guess every time
+def pick_best_guess(scores: np.ndarray, candidates: np.ndarray, tie_break=random.choice) -> int:
+  return int(tie_break(best_guesses(scores, candidates)))
+
+
+# uses the candidates kept by game_state when there is one, otherwise works them out from the whole history
+def _candidates(current_guesses, guess_feedback, game_state) -> np.ndarray:
+  if game_state is not None:
+    return game_state.candidates
+  return remaining_candidates(current_guesses, guess_feedback)
+
+
+# the guesses a solver may pick (indices into VALID_GUESSES) when game_state is in hard mode, see letter_masks.HardModeConstraints
+# None means every guess may be picked
+def hard_mode_guesses(game_state):
+  if game_state is None or not game_state.hard_mode:
+    return None
+  return game_state.allowed_guesses
+
+
+# spreads the scores of the guesses at guess_indices over every guess, the other guesses get -inf so they are never picked
+def spread_scores(scores: np.ndarray, guess_indices: np.ndarray) -> np.ndarray:
+  all_scores = np.full(len(VALID_GUESSES), -np.inf)
+  all_scores[guess_indices] = scores
+  return all_scores
+
+
+# every guess the entropy solver could pick this turn, it picks one of them at random
+# these only depend on the history, so they can be cached and sampled from instead of scoring every guess again
+def entropy_choices(current_guesses, guess_feedback, game_state=None) -> list[str]:
+  candidates = _candidates(current_guesses, guess_feedback, game_state)
+  # with one or two candidates left, guessing one of them is at least as good as anything else
+  if len(candidates) <= 2:
+    return [VALID_SOLUTIONS[i] for i in candidates]
+  guess_indices = hard_mode_guesses(game_state)
+  if guess_indices is None:
+    scores = entropy_scores(candidates)
+  else:
+    scores = spread_scores(entropy_scores(candidates, guess_indices), guess_indices)
+  return [VALID_GUESSES[i] for i in best_guesses(scores, candidates)]
+
+
+# picks the guess that maximizes the entropy of the feedback over the solutions that are still possible
+def entropy(current_guesses, guess_feedback, filtered_guesses, valid_solutions, game_state=None) -> str:
+  return random.choice(entropy_choices(current_guesses, guess_feedback, game_state))
+
+
+# the largest feedback bucket of every guess, i.e. the number of candidates left in the worst case, not counting the solved bucket
+# uses branch and bound: the guesses that could be the solution are scored first to get a bound, then every block of guesses
+# goes through the candidates a few at a time and drops the guesses whose largest bucket is already bigger than the best guess so far
+# dropped guesses get len(candidates) + 1, they are all strictly worse than the best guess, so every guess tied for the best is kept
+# the one exception: once a candidate leaves the fewest candidates possible, the other guesses are never looked at,
+# they can only tie it and best_guesses prefers candidates anyway
+# only the guesses at guess_indices are looked at when it's given, e.g. the guesses allowed in hard mode
+# callers that only need the smallest size can make this faster with bound and good_enough: guesses that leave more than bound
+# are dropped from the start, and the scan stops as soon as a guess leaves at most good_enough, so only the min of the result is exact
+def worst_case_sizes(candidates: np.ndarray, guess_indices=None, bound=None, good_enough=None) -> np.ndarray:
+  matrix = get_feedback_matrix()
+  num_candidates = len(candidates)
+  # no guess can leave fewer candidates than this in its largest bucket, there are NUM_PATTERNS - 1 unsolved buckets
+  lower_bound = -(-(num_candidates - 1) // (NUM_PATTERNS - 1))
+
+  sizes = np.full(len(VALID_GUESSES), num_candidates + 1)
+  if guess_indices is None:
+    candidate_guesses = np.sort(SOLUTION_GUESS_INDEX[candidates])
+  else:
+    candidate_guesses = np.intersect1d(SOLUTION_GUESS_INDEX[candidates], guess_indices)
+
+  # best is what a guess has to match to be kept, found is the smallest size of any guess looked at so far
+  best = num_candidates + 1 if bound is None else bound
+  kept, block_sizes = _block_worst_cases(np.take(matrix[candidate_guesses], candidates, axis=1), best)
+  if len(kept) > 0:
+    sizes[candidate_guesses[kept]] = block_sizes
+    best = min(best, int(block_sizes.min()))
+  found = int(sizes.min())
+  if found <= lower_bound or (good_enough is not None and found <= good_enough):
+    return sizes
+
+  # the candidates' columns of the other guesses are only copied once the candidates can't settle it
+  columns = matrix if num_candidates == matrix.shape[1] else np.take(matrix, candidates, axis=1)
+  scope = np.arange(len(VALID_GUESSES)) if guess_indices is None else guess_indices
+  other_guesses = np.setdiff1d(scope, candidate_guesses, assume_unique=True)
+  for start in range(0, len(other_guesses), MINIMAX_BLOCK_SIZE):
+    block = other_guesses[start:start + MINIMAX_BLOCK_SIZE]
+    kept, block_sizes = _block_worst_cases(columns[block], best)
+    if len(kept) > 0:
+      sizes[block[kept]] = block_sizes
+      found = min(found, int(block_sizes.min()))
+      best = min(best, found)
+    if good_enough is not None and found <= max(good_enough, lower_bound):
+      break
+  return sizes
+
+
+# the largest unsolved bucket of every row of patterns (guesses x candidates) that isn't bigger than best
+# returns the positions of the rows that were kept and their sizes, the rows are dropped as soon as their counts so far pass best
+def _block_worst_cases(patterns: np.ndarray, best: int) -> tuple[np.ndarray, np.ndarray]:
+  num_candidates = patterns.shape[1]
+  step = max(-(-num_candidates // MINIMAX_CANDIDATE_STEPS), MINIMAX_MIN_STEP)
+  kept = np.arange(len(patterns))
+  counts = np.zeros((len(patterns), NUM_PATTERNS), dtype=np.int32)
+  for start in range(0, num_candidates, step):
+    offsets = np.arange(len(kept), dtype=np.intp)[:, None] * NUM_PATTERNS
+    chunk = patterns[kept, start:start + step]
+    counts += np.bincount((chunk + offsets).ravel(), minlength=len(kept) * NUM_PATTERNS).reshape(len(kept), NUM_PATTERNS).astype(np.int32)
+    counts[:, ALL_CORRECT] = 0
+    keep = counts.max(axis=1) <= best
+    kept, counts = kept[keep], counts[keep]
+    if len(kept) == 0:
+      break
+  return kept, counts.max(axis=1)
+
+
+# minimax scores for every guess, higher is better like entropy_scores: minus the number of candidates left in the worst case
+def minimax_scores(candidates: np.ndarray, guess_indices=None) -> np.ndarray:
+  return -worst_case_sizes(candidates, guess_indices)
+
+
+# depth 2 lookahead: for the MINIMAX_LOOKAHEAD_WIDTH guesses with the smallest worst case, the number of candidates left in the worst case
+# after the guess and the best minimax guess for its feedback. Higher is better, the other guesses get -(len(candidates) + 1)
+# with guess_indices (hard mode), only those guesses are looked at and the follow-up guesses are limited to the candidates left,
+# which are always allowed in hard mode, so the lookahead never counts on a guess the rules wouldn't allow
+def lookahead_scores(candidates: np.ndarray, guess_indices=None) -> np.ndarray:
+  matrix = get_feedback_matrix()
+  sizes = worst_case_sizes(candidates, guess_indices)
+  is_candidate = np.zeros(len(VALID_GUESSES), dtype=bool)
+  is_candidate[SOLUTION_GUESS_INDEX[candidates]] = True
+  scope = np.arange(len(VALID_GUESSES)) if guess_indices is None else guess_indices
+  shortlist = scope[np.lexsort((~is_candidate[scope], sizes[scope]))][:MINIMAX_LOOKAHEAD_WIDTH]
+
+  scores = np.full(len(VALID_GUESSES), -(len(candidates) + 1))
+  best = len(candidates) + 1
+  for guess_index in shortlist:
+    patterns = matrix[guess_index, candidates]
+    buckets = [candidates[patterns == pattern] for pattern in np.unique(patterns) if pattern != ALL_CORRECT]
+    worst_after = 0
+    # biggest buckets first, so guesses that can't beat the best one are dropped as early as possible
+    for bucket in sorted(buckets, key=len, reverse=True):
+      # a bucket of n candidates leaves at most n - 1 after guessing one of them
+      if len(bucket) - 1 <= worst_after:
+        break
+      follow_ups = None if guess_indices is None else SOLUTION_GUESS_INDEX[bucket]
+      # only whether the best follow-up leaves more than worst_after (and at most best) matters here, see worst_case_sizes
+      worst_after = max(worst_after, int(worst_case_sizes(bucket, follow_ups, bound=best, good_enough=worst_after).min()))
+      if worst_after > best:
+        break
+    if worst_after <= best:
+      scores[guess_index] = -worst_after
+      best = worst_after
+  return scores
+
+
+# lookahead_scores once at most MINIMAX_LOOKAHEAD_MAX_CANDIDATES candidates are left, minimax_scores before that
+# since looking ahead from every bucket of a large candidate set takes seconds
+def minimax_lookahead_scores(candidates: np.ndarray, guess_indices=None) -> np.ndarray:
+  if len(candidates) <= MINIMAX_LOOKAHEAD_MAX_CANDIDATES:
+    return lookahead_scores(candidates, guess_indices)
+  return minimax_scores(candidates, guess_indices)
+
+
+# every guess the minimax solver could pick this turn, see entropy_choices
+# lookahead = True scores the guesses with minimax_lookahead_scores
+def minimax_choices(current_guesses, guess_feedback, game_state=None, lookahead=False) -> list[str]:
+  candidates = _candidates(current_guesses, guess_feedback, game_state)
+  if len(candidates) <= 2:
+    return [VALID_SOLUTIONS[i] for i in candidates]
+  guess_indices = hard_mode_guesses(game_state)
+  if lookahead:
+    scores = minimax_lookahead_scores(candidates, guess_indices)
+  else:
+    scores = minimax_scores(candidates, guess_indices)
+  return [VALID_GUESSES[i] for i in best_guesses(scores, candidates)]
+
+
+# picks the guess that leaves the fewest candidates in the worst case
+def minimax(current_guesses, guess_feedback, filtered_guesses, valid_solutions, game_state=None) -> str:
+  return random.choice(minimax_choices(current_guesses, guess_feedback, game_state))
+
+
+# minimax with the depth 2 lookahead: picks the guess that leaves the fewest candidates in the worst case after the next guess too
+def minimax_lookahead(current_guesses, guess_feedback, filtered_guesses, valid_solutions, game_state=None) -> str:
+  return random.choice(minimax_choices(current_guesses, guess_feedback, game_state, lookahead=True))
+
+
+# the scores of letter_frequency in wordle_master.ipynb for the guesses at guess_indices (what filter_on_feedback keeps) after the history
+# a guess gets the frequency over guess_indices of each of its distinct letters (the notebook divides every letter by how often
+# it is in the word, so repeated letters count once) divided by len(guess_indices), plus the LETTER_FREQUENCY_BONUS of every position
+# the scores are kept as integers in units of 1 / (4 * len(guess_indices)) so tied guesses tie exactly, divide to get the notebook's scores
+def letter_frequency_scores(current_guesses, guess_feedback, guess_indices: np.ndarray) -> np.ndarray:
+  counts = LETTER_COUNTS[guess_indices]
+  frequencies = counts.sum(axis=0, dtype=np.int64)
+  # a letter that was ever green gets the green bonus, even if it was yellow in another guess
+  bonus = np.zeros(26, dtype=np.int64)
+  for guess, feedback in zip(current_guesses, guess_feedback):
+    for letter, tile in zip(guess, feedback):
+      if tile in LETTER_FREQUENCY_BONUS:
+        bonus[ord(letter) - ord("A")] = max(bonus[ord(letter) - ord("A")], LETTER_FREQUENCY_BONUS[tile])
+  return 4 * ((counts > 0) @ frequencies) + len(guess_indices) * (counts @ bonus)
+
+
+# every guess the letter frequency solver could pick this turn, the filtered guesses with the highest score
+# in hard mode the guesses that are allowed take the place of the filtered guesses
+def letter_frequency_choices(current_guesses, guess_feedback, game_state=None) -> list[str]:
+  guess_indices = hard_mode_guesses(game_state)
+  if guess_indices is None:
+    guess_indices = filter_indices(current_guesses, guess_feedback)
+  scores = letter_frequency_scores(current_guesses, guess_feedback, guess_indices)
+  return [VALID_GUESSES[i] for i in guess_indices[scores == scores.max()]]
+
+
+# picks the filtered guess whose letters are the most frequent among the filtered guesses, see letter_frequency_scores
+# ties are broken with random, which Wordle seeds before every game
+def letter_frequency(current_guesses, guess_feedback, filtered_guesses, valid_solutions, game_state=None) -> str:
+  return random.choice(letter_frequency_choices(current_guesses, guess_feedback, game_state))
@@ -0,0 +1,83 @@
+# TF-IDF solver: every word is a document whose terms are its letters in each position, the letters it contains
+# and its letter bigrams and trigrams. The remaining candidates are the corpus, a term's idf is log(N / df) where N is the number
+# of candidates and df the number of candidates that have the term, and a word's tf-idf vector has tf * idf for each of its terms
+# (tf is 1, a word's repeated terms are counted once). A guess scores the dot product of its tf-idf vector with the mean
+# tf-idf vector of the candidates, which is sum(idf * df / N * idf) over its terms. Terms every candidate has (letters already known)
+# have an idf of 0 and terms almost no candidate has are rare in the mean, so both add little, terms that split the candidates add the most
+# the scores of all guesses are a sparse matrix-vector product of the term-document matrix with those per-term weights
+
+import random
+
+import numpy as np
+
+from words import WORD_LENGTH, VALID_GUESSES, VALID_SOLUTIONS, GUESS_ARRAY, SOLUTION_GUESS_INDEX
+import solvers
+
+# term ids: the letter in each position, then the letters a word contains, then letter bigrams, then letter trigrams
+POSITION_TERMS = 0
+LETTER_TERMS = POSITION_TERMS + WORD_LENGTH * 26
+BIGRAM_TERMS = LETTER_TERMS + 26
+TRIGRAM_TERMS = BIGRAM_TERMS + 26 ** 2
+NUM_TERMS = TRIGRAM_TERMS + 26 ** 3
+# fills the rows of words with fewer distinct terms than TERMS_PER_WORD, it never gets a weight
+PADDING_TERM = NUM_TERMS
+
+
+# builds the term-document matrix of VALID_GUESSES, which has at most TERMS_PER_WORD terms per word
+# it's stored as a (num_guesses, TERMS_PER_WORD) array of sorted term ids instead of the usual indptr/indices/data arrays,
+# so the rows of any set of words are taken with a single index. A word's repeated terms (e.g. the second E of EERIE) are padded
+def build_term_matrix(letters: np.ndarray) -> np.ndarray:
+  letters = letters.astype(np.int64)
+  terms = np.concatenate([
+    POSITION_TERMS + np.arange(WORD_LENGTH) * 26 + letters,
+    LETTER_TERMS + letters,
+    BIGRAM_TERMS + letters[:, :-1] * 26 + letters[:, 1:],
+    TRIGRAM_TERMS + letters[:, :-2] * 26 ** 2 + letters[:, 1:-1] * 26 + letters[:, 2:],
+  ], axis=1)
+  terms.sort(axis=1)
+  repeated = np.zeros(terms.shape, dtype=bool)
+  repeated[:, 1:] = terms[:, 1:] == terms[:, :-1]
+  terms[repeated] = PADDING_TERM
+  # intp like numpy's own indices, indexing the weights with any other type converts the whole matrix every turn
+  return terms.astype(np.intp)
+
+
+# built once per process when the module is imported, it takes a few milliseconds
+TERM_MATRIX = build_term_matrix(GUESS_ARRAY)
+TERMS_PER_WORD = TERM_MATRIX.shape[1]
+
+
+# the idf of every term over the candidates times the term's weight in their mean tf-idf vector, built from the candidates' rows only
+# so it gets cheaper every turn as the candidates shrink. Terms no candidate has get 0
+def term_weights(candidates: np.ndarray) -> np.ndarray:
+  document_frequency = np.bincount(TERM_MATRIX[SOLUTION_GUESS_INDEX[candidates]].ravel(), minlength=NUM_TERMS + 1)
+  document_frequency[PADDING_TERM] = 0
+  with np.errstate(divide="ignore"):
+    idf = np.log(len(candidates) / document_frequency)
+  idf[document_frequency == 0] = 0
+  return idf * (document_frequency / len(candidates)) * idf
+
+
+# tf-idf scores for every guess, higher is better like solvers.entropy_scores
+def tfidf_scores(candidates: np.ndarray) -> np.ndarray:
+  return term_weights(candidates)[TERM_MATRIX].sum(axis=1)
+
+
+# every guess the tfidf solver could pick this turn, see solvers.entropy_choices
+def tfidf_choices(current_guesses, guess_feedback, game_state=None) -> list[str]:
+  if game_state is not None:
+    candidates = game_state.candidates
+  else:
+    candidates = solvers.remaining_candidates(current_guesses, guess_feedback)
+  if len(candidates) <= 2:
+    return [VALID_SOLUTIONS[i] for i in candidates]
+  scores = tfidf_scores(candidates)
+  guess_indices = solvers.hard_mode_guesses(game_state)
+  if guess_indices is not None:
+    scores = solvers.spread_scores(scores[guess_indices], guess_indices)
+  return [VALID_GUESSES[i] for i in solvers.best_guesses(scores, candidates)]
+
+
+# picks the guess whose terms best split the remaining candidates, input_function for Wordle
+def tfidf(current_guesses, guess_feedback, filtered_guesses, valid_solutions, game_state=None) -> str:
+  return random.choice(tfidf_choices(current_guesses, guess_feedback, game_state))
@@ -1,30 +1,29 @@
 # contains the implementation of the base Wordle game class
 
-import pathlib
+import inspect
 import random
 import string
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-# https://gist.github.com/cfreshman/d97dbe7004522f7bc52ed2a6e22e2c04
-GUESSES_PATH = pathlib.Path(__file__).parent / "valid_guesses.txt"
-
-# https://www.kaggle.com/datasets/bcruise/wordle-valid-words
-SOLUTIONS_PATH = pathlib.Path(__file__).parent / "valid_solutions.txt"
+from words import VALID_GUESSES, VALID_SOLUTIONS, GUESS_SET
+from feedback_matrix import PATTERN_STRINGS, get_feedback, get_feedback_code, get_feedback_matrix
+from letter_masks import filter_on_feedback
+from opening_book import get_book_guess
+from game_state import GameState
+from instrumentation import TurnRecorder
 
 WORD_LENGTH = 5
 NUM_GUESSES = 6
 
 # Wordle class: runs all the Wordle games. Has various flags for how the game class should accept input and how it should display output.
 class Wordle:
-  def __init__(self, input_function=None, verbose=True, stats=True, simulate=0, initial_guesses=[]) -> None:
-    # read word lists into memory, ENFORCING ALL WORDS AS CAPITAL LETTERS
-    with open(GUESSES_PATH, "r") as read_obj:
-      self.valid_guesses = read_obj.read().split()
-      for i in range(len(self.valid_guesses)):
-        self.valid_guesses[i] = self.valid_guesses[i].upper()
-    with open(SOLUTIONS_PATH, "r") as read_obj:
-      self.valid_solutions = read_obj.read().split()
-      for i in range(len(self.valid_solutions)):
-        self.valid_solutions[i] = self.valid_solutions[i].upper()
+  def __init__(self, input_function=None, verbose=True, stats=True, simulate=0, initial_guesses=[], workers=1,
+               exhaustive=False, seed=0, opening_book=None, instrument=False, hard_mode=False) -> None:
+    # word lists are read once per process by words.py, ALL WORDS ARE CAPITAL LETTERS
+    # these are shared between instances, so don't modify them
+    self.valid_guesses = VALID_GUESSES
+    self.valid_solutions = VALID_SOLUTIONS
 
     # README
     # keep track of the input function. If you want to accept input from the user, input_function will be of type None
@@ -33,7 +32,11 @@ class Wordle:
     # where current_guesses, guess_feedback match their definition down below in the play function
     # and filtered_guesses is the result returned by filter_on_feedback in the Wordle class
     # This function will return a string to be used as the next guess
+    # input functions can also take a game_state keyword argument. They are passed the GameState of the current game,
+    # which keeps the candidate solutions that are left, and None for filtered_guesses: use game_state.filtered_guesses instead,
+    # it is only worked out when it's used
     self.input_function = input_function
+    self.takes_game_state = input_function is not None and "game_state" in inspect.signature(input_function).parameters
 
     # verbose = True means print_state will be used after every guess. Otherwise, only the stats are printed.
     self.verbose = verbose
@@ -45,6 +48,34 @@ class Wordle:
     # otherwise the game class will prompt you if you want to continue playing
     self.simulate = simulate
 
+    # workers > 1 means simulations are spread across that many processes, e.g. workers=os.cpu_count()
+    # only used when simulate > 0 and there is an input_function. input_function has to be defined at the top level of a module
+    # so it can be sent to the worker processes, and verbose output is not shown for these games
+    self.workers = workers
+
+    # exhaustive = True means play plays every word in valid_solutions exactly once instead of random solutions
+    # and prints a report with the win rate, average number of guesses, guess distribution and the hardest words, see evaluate
+    # the stats of the single games are never printed in this mode, only the report at the end
+    # seed is used to seed random before every one of these games, so solvers that break ties randomly give the same report every run
+    self.exhaustive = exhaustive
+    self.seed = seed
+
+    # opening_book is the name of a mode in opening_book.json, e.g. "entropy". The first two guesses are looked up in the book
+    # instead of calling input_function, which is much faster since those turns have the most possible solutions left
+    self.opening_book = opening_book
+
+    # instrument = True records the time every turn takes to pick a guess and to filter, and the number of candidates before and after
+    # the guess. A table with percentiles per turn is printed at the end of play, self.recorder can also export every turn to JSON or CSV
+    # see instrumentation.py. When it's False, nothing is timed
+    self.recorder = TurnRecorder() if instrument else None
+    # time spent in filter_on_feedback during the current turn, only kept track of when instrument = True
+    self.turn_filter_time = 0.0
+
+    # hard_mode = True means every guess has to be a word that could still be the solution after all the feedback so far,
+    # see letter_masks.HardModeConstraints. Guesses that break the rules are invalid, input functions get the allowed guesses
+    # as filtered_guesses and solvers that take a game_state only pick allowed guesses. initial_guesses aren't checked
+    self.hard_mode = hard_mode
+
     # keep a list of initial guesses to use, if your algorithm demands it
     # this will be used to initialize current_guesses in the play loop
     self.initial_guesses = initial_guesses
@@ -57,60 +88,24 @@ class Wordle:
     self.num_wins = 0
 
   def play(self) -> None:
+    if self.exhaustive:
+      self.print_evaluation(self.evaluate())
+    # simulations with an input function can be spread across processes, see simulate_in_parallel
+    elif self.simulate > 0 and self.workers > 1 and self.input_function is not None:
+      self.simulate_in_parallel()
+    else:
+      self.play_games()
+
+    if self.recorder is not None:
+      self.recorder.print_summary()
+
+  # plays games one after another until self.simulate games are played or the user quits
+  def play_games(self) -> None:
     while True:
       # select solution word
       current_solution = random.choice(self.valid_solutions)
 
-      current_guesses = self.initial_guesses.copy()
-
-      # C for correct, M for misplaced, W for wrong
-      guess_feedback = []
-
-      # since there are initial guesses now, also need to populate guess_feedback
-      for i in current_guesses:
-        guess_feedback.append(self.generate_feedback(i, current_solution))
-
-      # start a game
-      for guess_num in range(len(current_guesses), NUM_GUESSES):
-        if self.input_function is None:
-          current_guess = input(f"Guess {guess_num + 1}: ").upper()
-        else:
-          current_guess = self.input_function(current_guesses,
-                                              guess_feedback,
-                                              self.filter_on_feedback(current_guesses, guess_feedback),
-                                              self.valid_solutions)
-
-        # make sure the user guess is valid
-        while not self.is_valid_guess(current_guess):
-          if self.input_function is None:
-            current_guess = input(f"Invalid guess, try again. Guess {guess_num + 1}: ").upper()
-          else:
-            # should not ever get to this else statement, since input_function should return a word from the list of valid guesses/solutions
-            current_guess = self.input_function(current_guesses,
-                                                guess_feedback,
-                                                self.filter_on_feedback(current_guesses, guess_feedback),
-                                                self.valid_solutions)
-
-        # valid guess has been obtained
-        current_guesses.append(current_guess)
-        if current_guess == current_solution:
-          break
-
-        # generate feedback for current guess
-        # change to "C" if correct, change to "M" if misplaced. W is wrong
-        guess_feedback.append(self.generate_feedback(current_guess, current_solution))
-
-
-        # print state after every guess
-        if self.verbose:
-          self.print_state(current_guesses, guess_feedback)
-
-      # ending states
-      if self.verbose:
-        if current_guesses[-1] == current_solution:
-            print(f"\nCongratulations! You have correctly guessed {current_solution} in {len(current_guesses)} tries!")
-        else:
-            print(f"\nUnfortunately, you have failed to correctly guess {current_solution}.")
+      current_guesses = self.play_game(current_solution)
 
       # update stats and print after each game
       self.get_print_stats(current_guesses[-1] == current_solution, len(current_guesses))
@@ -123,9 +118,179 @@ class Wordle:
         if self.simulate == self.num_games:
           break
 
+  # plays a single game against current_solution and returns the list of guesses made
+  # finish_early = True means the game ends as soon as only one solution matches all of the feedback so far:
+  # that word is guessed right away without asking input_function
+  def play_game(self, current_solution: str, finish_early=False) -> list[str]:
+    current_guesses = self.initial_guesses.copy()
+
+    # C for correct, M for misplaced, W for wrong
+    guess_feedback = []
+
+    # since there are initial guesses now, also need to populate guess_feedback
+    for i in current_guesses:
+      guess_feedback.append(get_feedback(i, current_solution))
+
+    # keeps the solutions that match all of the feedback so far, narrowed down after every guess
+    game_state = GameState(current_guesses, guess_feedback, self.hard_mode)
+
+    # start a game
+    for guess_num in range(len(current_guesses), NUM_GUESSES):
+      if finish_early and len(game_state.candidates) == 1:
+        current_guesses.append(self.valid_solutions[game_state.candidates[0]])
+        break
+
+      if self.recorder is not None:
+        turn_start = time.perf_counter()
+        self.turn_filter_time = 0.0
+        candidates_before = len(game_state.candidates)
+
+      if self.input_function is None:
+        current_guess = input(f"Guess {guess_num + 1}: ").upper()
+      else:
+        # check the opening book before running input_function
+        current_guess = get_book_guess(self.opening_book, current_guesses, guess_feedback)
+        if current_guess is None or not game_state.allows(current_guess):
+          current_guess = self.call_input_function(current_guesses, guess_feedback, game_state)
+
+      # make sure the user guess is valid
+      while not self.is_valid_guess(current_guess) or not game_state.allows(current_guess):
+        if self.input_function is None:
+          current_guess = input(f"Invalid guess, try again. Guess {guess_num + 1}: ").upper()
+        else:
+          # should not ever get to this else statement, since input_function should return a word from the list of valid guesses/solutions
+          current_guess = self.call_input_function(current_guesses, guess_feedback, game_state)
+
+      # valid guess has been obtained
+      current_guesses.append(current_guess)
+      if self.recorder is not None:
+        input_time = time.perf_counter() - turn_start - self.turn_filter_time
+      if current_guess == current_solution:
+        if self.recorder is not None:
+          self.recorder.record(current_solution, guess_num + 1, input_time, self.turn_filter_time, candidates_before, 1)
+        break
+
+      # generate feedback for current guess
+      # change to "C" if correct, change to "M" if misplaced. W is wrong
+      # the pattern code is looked up in the precomputed feedback matrix, PATTERN_STRINGS has the same string as generate_feedback
+      # game_state narrows the candidates with the code directly
+      feedback_code = get_feedback_code(current_guess, current_solution)
+      guess_feedback.append(PATTERN_STRINGS[feedback_code])
+      if self.recorder is None:
+        game_state.update(current_guess, guess_feedback[-1], feedback_code)
+      else:
+        update_start = time.perf_counter()
+        game_state.update(current_guess, guess_feedback[-1], feedback_code)
+        filter_time = self.turn_filter_time + time.perf_counter() - update_start
+        self.recorder.record(current_solution, guess_num + 1, input_time, filter_time, candidates_before, len(game_state.candidates))
+
+      # print state after every guess
+      if self.verbose:
+        self.print_state(current_guesses, guess_feedback)
+
+    # ending states
+    if self.verbose:
+      if current_guesses[-1] == current_solution:
+          print(f"\nCongratulations! You have correctly guessed {current_solution} in {len(current_guesses)} tries!")
+      else:
+          print(f"\nUnfortunately, you have failed to correctly guess {current_solution}.")
+
+    return current_guesses
+
+  # gets the next guess from input_function, see the README in __init__ for the arguments
+  def call_input_function(self, current_guesses, guess_feedback, game_state: GameState) -> str:
+    if self.takes_game_state:
+      return self.input_function(current_guesses, guess_feedback, None, self.valid_solutions, game_state=game_state)
+    if self.recorder is None:
+      filtered_guesses = self.filter_guesses(current_guesses, guess_feedback, game_state)
+    else:
+      filter_start = time.perf_counter()
+      filtered_guesses = self.filter_guesses(current_guesses, guess_feedback, game_state)
+      self.turn_filter_time += time.perf_counter() - filter_start
+    return self.input_function(current_guesses,
+                               guess_feedback,
+                               filtered_guesses,
+                               self.valid_solutions)
+
+  # filtered_guesses for input_function: filter_on_feedback, or the guesses that are allowed in hard mode
+  def filter_guesses(self, current_guesses, guess_feedback, game_state: GameState) -> list[str]:
+    if self.hard_mode:
+      return game_state.filtered_guesses
+    return self.filter_on_feedback(current_guesses, guess_feedback)
+
+  # plays self.simulate games split across self.workers processes
+  # the result of every game is passed to get_print_stats, so the totals are the same as playing them one after another
+  def simulate_in_parallel(self) -> None:
+    # a few batches per worker so a slow batch doesn't leave the other workers idle
+    num_batches = min(self.simulate, self.workers * 4)
+    # every batch gets its own seed, otherwise forked workers would all start from the same random state
+    batches = [(self.simulate // num_batches + (i < self.simulate % num_batches), random.getrandbits(32)) for i in range(num_batches)]
+
+    for win, num_guesses in self.run_in_parallel(_simulate_games, batches):
+      self.get_print_stats(win, num_guesses)
+
+  # plays every word in valid_solutions exactly once, finishing each game early once the solution is the only candidate left
+  # returns a report with the win rate, average number of guesses, a histogram of the number of guesses ("X" for losses)
+  # and the num_worst hardest words, lost games first, then the games that took the most guesses
+  def evaluate(self, num_worst=10) -> dict:
+    solution_indices = list(range(len(self.valid_solutions)))
+    if self.workers > 1 and self.input_function is not None:
+      num_batches = self.workers * 4
+      results = self.run_in_parallel(_evaluate_solutions, [solution_indices[i::num_batches] for i in range(num_batches)])
+    else:
+      results = self.evaluate_solutions(solution_indices)
+    results.sort()
+
+    histogram = {num_guesses: 0 for num_guesses in range(1, NUM_GUESSES + 1)}
+    histogram["X"] = 0
+    for solution_index, win, num_guesses in results:
+      histogram[num_guesses if win else "X"] += 1
+      self.record_stats(win, num_guesses)
+
+    hardest = sorted(results, key=lambda result: (result[1], -result[2]))[:num_worst]
+    return {
+      "num_games": len(results),
+      "win_rate": sum(win for _, win, _ in results) / len(results),
+      "avg_guesses": sum(num_guesses for _, _, num_guesses in results) / len(results),
+      "histogram": histogram,
+      "worst_words": [(self.valid_solutions[solution_index], num_guesses if win else "X") for solution_index, win, num_guesses in hardest],
+    }
+
+  # plays the solutions at solution_indices for evaluate, random is seeded with self.seed + solution index before every game
+  # so a game plays out the same no matter which process it runs in or which games were played before it
+  def evaluate_solutions(self, solution_indices) -> list[tuple[int, bool, int]]:
+    results = []
+    for solution_index in solution_indices:
+      random.seed(self.seed + solution_index)
+      current_solution = self.valid_solutions[solution_index]
+      current_guesses = self.play_game(current_solution, finish_early=True)
+      results.append((solution_index, current_guesses[-1] == current_solution, len(current_guesses)))
+    return results
+
+  # runs worker_function(self.input_function, self.initial_guesses, self.seed, self.opening_book, instrument, self.hard_mode, batch) for every batch
+  # across self.workers processes. Every worker loads the word lists and feedback matrix once, then plays its share of games
+  # with verbose and stats turned off. Workers return their results and recorded turns, the turns are added to self.recorder
+  # returns the results of all batches in one list, in the order the batches finished
+  def run_in_parallel(self, worker_function, batches) -> list:
+    # build the feedback matrix up front so the workers only have to memory-map it
+    get_feedback_matrix()
+
+    results = []
+    instrument = self.recorder is not None
+    with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker) as executor:
+      futures = [executor.submit(worker_function, self.input_function, self.initial_guesses, self.seed, self.opening_book, instrument,
+                                 self.hard_mode, batch)
+                 for batch in batches]
+      for future in as_completed(futures):
+        batch_results, turns = future.result()
+        results.extend(batch_results)
+        if instrument:
+          self.recorder.turns.extend(turns)
+    return results
+
   # checks if a guess is valid. Current guess has to be WORD_LENGTH in length, all letters, and in valid_guesses
   def is_valid_guess(self, current_guess: str) -> bool:
-    return len(current_guess) == WORD_LENGTH and current_guess.isalpha() and current_guess.upper() in self.valid_guesses
+    return len(current_guess) == WORD_LENGTH and current_guess.isalpha() and current_guess.upper() in GUESS_SET
 
   # generates feedback for current guess
   # static method so you can call this method with Wordle.generate_feedback outside of the class
@@ -166,55 +331,32 @@ class Wordle:
     # it's hard to eliminate other letters as there are only 2 more spots left
     # We will let individual algorithms handle what to do with the green tiles
 
-    filtered_guesses = []
-
-    # keeps an array of all letters that shouldn't be in that position
-    # this means either letters that are wrong (these letters should be added to all letter positions)
-    # or letters that are misplaced for this position
-    letter_not_in_position = [set() for i in range(WORD_LENGTH)]
-    # helps in cases where a word has multiple of the same letter
-    not_wrong_letters = set()
-
-    # need separate for loops because words with multiple of the same letter would have that letter be propogated to all positions
-    for guess, feedback in zip(current_guesses, guess_feedback):
-      for i in range(WORD_LENGTH):
-        if feedback[i] == "M":
-          letter_not_in_position[i].add(guess[i])
-          not_wrong_letters.add(guess[i])
-        elif feedback[i] == "C":
-          # read the description above for why we don't do anything else with correct letters
-          not_wrong_letters.add(guess[i])
-    for guess, feedback in zip(current_guesses, guess_feedback):
-      for i in range(WORD_LENGTH):
-        if feedback[i] == "W":
-          if guess[i] in not_wrong_letters:
-            letter_not_in_position[i].add(guess[i])
-          else:
-            # propagate to all positions, since letter cannot be in word at all
-            for j in range(WORD_LENGTH):
-              letter_not_in_position[j].add(guess[i])
-
-    # now go through the list of guesses and append to filtered guesses if no letters in word at that position are in letter_not_in_position
-    for word in self.valid_guesses:
-      valid = True
-      for i in range(WORD_LENGTH):
-        if word[i] in letter_not_in_position[i]:
-          valid = False
-          break
-      if valid:
-        filtered_guesses.append(word)
-
-    return filtered_guesses
+    # letter_masks keeps a bitmask of every letter position of every word, so this is a few array operations
+    # instead of checking every letter of every word in valid_guesses
+    return filter_on_feedback(current_guesses, guess_feedback, self.valid_guesses)
 
   def get_print_stats(self, win: bool, num_guesses: int) -> None:
+    self.record_stats(win, num_guesses)
+
+    if self.stats or (not self.stats and self.simulate > 0 and self.num_games == self.simulate):
+      print(f"\nCurrent win rate: {self.num_wins} / {self.num_games} = {self.num_wins / self.num_games}")
+      print(f"Average number of guesses: {self.num_guesses / self.num_games}\n")
+
+  # adds a game to the stats without printing anything
+  def record_stats(self, win: bool, num_guesses: int) -> None:
     if win:
         self.num_wins += 1
     self.num_games += 1
     self.num_guesses += num_guesses
 
-    if self.stats or (not self.stats and self.simulate > 0 and self.num_games == self.simulate):
-      print(f"\nCurrent win rate: {self.num_wins} / {self.num_games} = {self.num_wins / self.num_games}")
-      print(f"Average number of guesses: {self.num_guesses / self.num_games}\n")
+  def print_evaluation(self, report: dict) -> None:
+    print(f"\nSolutions played: {report['num_games']}")
+    print(f"Win rate: {report['win_rate']}")
+    print(f"Average number of guesses: {report['avg_guesses']}")
+    print("Guess distribution:")
+    for num_guesses, count in report["histogram"].items():
+      print(f"\t{num_guesses}: {count}")
+    print(f"Hardest words: {', '.join(f'{word} ({num_guesses})' for word, num_guesses in report['worst_words'])}\n")
 
   def print_state(self, current_guesses: list[str], guess_feedback: list[str]) -> None:
     correct = set()
@@ -243,6 +385,33 @@ class Wordle:
     print(f"Wrong: {', '.join(sorted(list(wrong)))}")
     print(f"Unused: {', '.join(sorted(list(set(string.ascii_uppercase).difference(correct).difference(misplaced).difference(wrong))))}\n")
 
+# runs once in every worker process of Wordle.simulate_in_parallel, loads the precomputed data before any game is played
+def _init_worker() -> None:
+  get_feedback_matrix()
+
+
+# plays a batch of random games for Wordle.simulate_in_parallel in a worker process
+# returns (win, num_guesses) for each one and the recorded turns if instrument is True
+def _simulate_games(input_function, initial_guesses, seed, opening_book, instrument, hard_mode, batch) -> tuple[list[tuple[bool, int]], list]:
+  num_games, batch_seed = batch
+  random.seed(batch_seed)
+  game = Wordle(input_function=input_function, verbose=False, stats=False, initial_guesses=initial_guesses, opening_book=opening_book,
+                instrument=instrument, hard_mode=hard_mode)
+  results = []
+  for _ in range(num_games):
+    current_solution = random.choice(game.valid_solutions)
+    current_guesses = game.play_game(current_solution)
+    results.append((current_guesses[-1] == current_solution, len(current_guesses)))
+  return results, game.recorder.turns if instrument else []
+
+
+# plays a batch of solutions for Wordle.evaluate in a worker process
+def _evaluate_solutions(input_function, initial_guesses, seed, opening_book, instrument, hard_mode,
+                        solution_indices) -> tuple[list[tuple[int, bool, int]], list]:
+  game = Wordle(input_function=input_function, verbose=False, stats=False, initial_guesses=initial_guesses, seed=seed,
+                opening_book=opening_book, instrument=instrument, hard_mode=hard_mode)
+  return game.evaluate_solutions(solution_indices), game.recorder.turns if instrument else []
+
 if __name__ == "__main__":
     game = Wordle()
     game.play()
\ No newline at end of file
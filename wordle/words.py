@@ -0,0 +1,140 @@
+# loads the word lists once per process and shares them between the Wordle class, the Flask backends and utility.py
+# lists keep the original order so an index means the same word everywhere, sets and index maps make lookups constant time
+# both lists are packed into words.bin by running this file from the wordle folder: python words.py
+# words.bin is memory-mapped, so GUESS_ARRAY is a view of the file and no Python object is made per word when the module loads.
+# the word strings, sets and index maps are only built the first time one of them is used.
+# if words.bin is missing or older than the text files, the text files are read instead
+
+import os
+import pathlib
+import struct
+
+import numpy as np
+
+# https://gist.github.com/cfreshman/d97dbe7004522f7bc52ed2a6e22e2c04
+GUESSES_PATH = pathlib.Path(__file__).parent / "valid_guesses.txt"
+
+# https://www.kaggle.com/datasets/bcruise/wordle-valid-words
+SOLUTIONS_PATH = pathlib.Path(__file__).parent / "valid_solutions.txt"
+
+WORD_LENGTH = 5
+NUM_GUESSES = 6
+
+# packed word lists: a header, every valid guess as WORD_LENGTH letter indices (A = 0 ... Z = 25) of one byte,
+# then the index in the valid guesses of every valid solution as uint32, which marks the solutions and keeps their order
+# the letters are stored the way GUESS_ARRAY holds them so the memory-map can be used without copying it
+WORDS_PATH = pathlib.Path(__file__).parent / "words.bin"
+WORDS_MAGIC = b"WRDL"
+WORDS_VERSION = 2
+# magic, version, word length, number of guesses, number of solutions
+WORDS_HEADER = struct.Struct("<4sHHII")
+
+
+# reads the text files, ENFORCING ALL WORDS AS CAPITAL LETTERS
+def read_word_lists() -> tuple[list[str], list[str]]:
+  with open(GUESSES_PATH, "r") as read_obj:
+    valid_guesses = [word.upper() for word in read_obj.read().split()]
+  with open(SOLUTIONS_PATH, "r") as read_obj:
+    valid_solutions = [word.upper() for word in read_obj.read().split()]
+  return valid_guesses, valid_solutions
+
+
+# the offset of the solution indices in words.bin, padded so they are aligned
+def _solutions_offset(num_guesses: int) -> int:
+  end = WORDS_HEADER.size + num_guesses * WORD_LENGTH
+  return end + -end % 4
+
+
+# packs the text files into words.bin, writing to a temporary file first so other processes never load a half written file
+def pack_word_lists(path=WORDS_PATH) -> None:
+  valid_guesses, valid_solutions = read_word_lists()
+  guess_index = {word: i for i, word in enumerate(valid_guesses)}
+  solution_guess_index = np.array([guess_index[word] for word in valid_solutions], dtype="<u4")
+
+  temp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp")
+  with open(temp_path, "wb") as write_obj:
+    write_obj.write(WORDS_HEADER.pack(WORDS_MAGIC, WORDS_VERSION, WORD_LENGTH, len(valid_guesses), len(valid_solutions)))
+    write_obj.write(words_to_array(valid_guesses).tobytes())
+    write_obj.write(bytes(_solutions_offset(len(valid_guesses)) - write_obj.tell()))
+    write_obj.write(solution_guess_index.tobytes())
+  os.replace(temp_path, path)
+
+
+# returns the (num guesses, WORD_LENGTH) uint8 array of letter indices and the index in it of every solution,
+# memory-mapped from words.bin, or None if words.bin is missing, older than the text files or from another version
+def load_packed_word_lists(path=WORDS_PATH):
+  if not path.exists() or path.stat().st_mtime < max(GUESSES_PATH.stat().st_mtime, SOLUTIONS_PATH.stat().st_mtime):
+    return None
+  with open(path, "rb") as read_obj:
+    magic, version, word_length, num_guesses, num_solutions = WORDS_HEADER.unpack(read_obj.read(WORDS_HEADER.size))
+  if magic != WORDS_MAGIC or version != WORDS_VERSION or word_length != WORD_LENGTH:
+    return None
+  guess_letters = np.memmap(path, dtype=np.uint8, mode="r", offset=WORDS_HEADER.size, shape=(num_guesses, WORD_LENGTH))
+  solution_guess_index = np.memmap(path, dtype="<u4", mode="r", offset=_solutions_offset(num_guesses), shape=(num_solutions,))
+  return guess_letters, solution_guess_index
+
+
+# converts a list of words into an (N, WORD_LENGTH) array of letter indices, A = 0 ... Z = 25
+def words_to_array(words) -> np.ndarray:
+  joined = "".join(words).upper().encode("ascii")
+  return (np.frombuffer(joined, dtype=np.uint8) - ord("A")).reshape(-1, WORD_LENGTH)
+
+
+# VALID_GUESSES and VALID_SOLUTIONS keep the order of the arrays.
+# use GUESS_SET and SOLUTION_SET for membership checks, "word in VALID_GUESSES" scans the whole list,
+# GUESS_INDEX and SOLUTION_INDEX map a word to its index in VALID_GUESSES / VALID_SOLUTIONS
+WORD_OBJECTS = ("VALID_GUESSES", "VALID_SOLUTIONS", "GUESS_SET", "SOLUTION_SET", "GUESS_INDEX", "SOLUTION_INDEX")
+
+
+# builds the word objects and sets them as module attributes, the words are sliced out of one decoded string of all the letters
+# two threads building them at once only build the same objects twice
+def _build_word_objects() -> None:
+  if "VALID_GUESSES" in globals():
+    valid_guesses, valid_solutions = VALID_GUESSES, VALID_SOLUTIONS
+  else:
+    joined = (GUESS_ARRAY + np.uint8(ord("A"))).tobytes().decode("ascii")
+    valid_guesses = [joined[i:i + WORD_LENGTH] for i in range(0, len(joined), WORD_LENGTH)]
+    valid_solutions = [valid_guesses[i] for i in SOLUTION_GUESS_INDEX.tolist()]
+  globals().update(
+    VALID_GUESSES=valid_guesses,
+    VALID_SOLUTIONS=valid_solutions,
+    GUESS_SET=frozenset(valid_guesses),
+    SOLUTION_SET=frozenset(valid_solutions),
+    GUESS_INDEX={word: i for i, word in enumerate(valid_guesses)},
+    SOLUTION_INDEX={word: i for i, word in enumerate(valid_solutions)},
+  )
+
+
+# letter index arrays of both word lists, row i is VALID_GUESSES[i] or VALID_SOLUTIONS[i]
+# from words.bin GUESS_ARRAY is the read-only memory-map itself
+_packed = load_packed_word_lists()
+if _packed is not None:
+  GUESS_ARRAY, _solution_guess_index = _packed
+else:
+  VALID_GUESSES, VALID_SOLUTIONS = read_word_lists()
+  GUESS_ARRAY = words_to_array(VALID_GUESSES)
+  _build_word_objects()
+  _solution_guess_index = [GUESS_INDEX[word] for word in VALID_SOLUTIONS]
+
+# index in VALID_SOLUTIONS -> index in VALID_GUESSES, every solution is also a valid guess
+SOLUTION_GUESS_INDEX = np.asarray(_solution_guess_index, dtype=np.intp)
+SOLUTION_ARRAY = GUESS_ARRAY[SOLUTION_GUESS_INDEX]
+
+
+# called for module attributes that aren't set yet, "from words import GUESS_SET" ends up here the first time too
+def __getattr__(name: str):
+  if name in WORD_OBJECTS:
+    if name not in globals():
+      _build_word_objects()
+    return globals()[name]
+  raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# checks if a guess is valid. Current guess has to be WORD_LENGTH in length, all letters, and in valid_guesses
+def is_valid_guess(current_guess: str) -> bool:
+  return len(current_guess) == WORD_LENGTH and current_guess.isalpha() and current_guess.upper() in __getattr__("GUESS_SET")
+
+
+if __name__ == "__main__":
+  pack_word_lists()
+  print(f"Packed {len(GUESS_ARRAY)} guesses and {len(SOLUTION_ARRAY)} solutions into {WORDS_PATH.name}")